@@ -1,38 +1,73 @@
 # api/main.py
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+from anyio import to_thread
+import asyncio
+import logging
 
 from api.routers import user, dashboard, journal, anonymous # Import your routers
 from core.db import db_manager # Import the db connection manager
+from core.config import get_settings
+from core.log import configure_logging
+from models.examples import OPENAPI_EXAMPLES
+from services.external import mongodb_handler, gemini_handler # Startup index setup and warm-up
+
+settings = get_settings()
+
+# Default INFO so logger.debug(...) calls short-circuit at isEnabledFor in production
+logging.basicConfig(level=settings.log_level)
+# Routers log through structlog (JSON via orjson); below-level calls are no-ops
+configure_logging(settings.log_level)
 
 # --- Lifespan Management ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Actions to perform on startup
+    # Raise the threadpool used for sync dependencies/to_thread offloads (anyio default: 40)
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
     await db_manager.connect_db()
-    # Initialize other resources like Gemini client if needed
-    # print("Gemini Client Initialized...") # Placeholder
+    await mongodb_handler.bind_collections() # Query functions use these references directly
+    db_manager.start_health_check() # Periodic ping, off the request path
+    # Indexes + warm-up run concurrently so the first requests don't pay cold-start costs
+    await asyncio.gather(
+        mongodb_handler.ensure_indexes(), # Indexes for the hot query paths
+        mongodb_handler.warm_up(),
+        gemini_handler.warm_up_async() # Gemini client itself is a module-level singleton
+    )
     yield # The application runs while yielded
     # Actions to perform on shutdown
     await db_manager.close_db()
-    # print("Gemini Client Closed...") # Placeholder
+    await gemini_handler.close_async()
 
 # --- FastAPI App Creation ---
 app = FastAPI(
     title="Echo V2 API",
     description="API for journaling, reflections, and user data.",
     version="0.1.0",
+    default_response_class=ORJSONResponse, # Serialize responses with orjson instead of stdlib json
+    redirect_slashes=False, # Serve only the canonical paths; no extra 307 round-trip for trailing slashes
     lifespan=lifespan # Use the lifespan context manager
 )
 
 # --- Middleware ---
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], # Allow all origins (adjust for production)
+    allow_origins=settings.allowed_origins, # Explicit allowlist (a wildcard is invalid with credentials)
     allow_credentials=True,
-    allow_methods=["*"], # Allow all methods
-    allow_headers=["*"], # Allow all headers
+    allow_methods=["GET", "POST"], # Only the methods the API exposes
+    allow_headers=["Authorization", "Content-Type"],
+    expose_headers=[],
+)
+
+# Compress JSON/text responses (GZipMiddleware already leaves text/event-stream SSE responses alone)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=500, # Small payloads aren't worth the CPU
+    compresslevel=5,
 )
 
 # --- Routers ---
@@ -41,23 +76,55 @@ app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"]
 app.include_router(journal.router, prefix="/api", tags=["Journal"]) 
 app.include_router(anonymous.router, prefix="/api", tags=["Anonymous"])# Assuming journal endpoints are under /api
 
+# --- OpenAPI Schema ---
+def custom_openapi():
+    """Generates the OpenAPI schema once, attaching model examples from models/examples.py."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    openapi_schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes
+    )
+    schemas = openapi_schema.get("components", {}).get("schemas", {})
+    for name, examples in OPENAPI_EXAMPLES.items():
+        if name in schemas:
+            schemas[name]["examples"] = examples
+    app.openapi_schema = openapi_schema
+    return app.openapi_schema
+
+app.openapi = custom_openapi
+
 # --- Root Endpoint (Optional Health Check) ---
 @app.get("/", tags=["Root"])
 async def read_root():
     """Root endpoint for basic health check."""
     return {"status": "ok", "message": "Welcome to Echo V2 API!"}
 
+@app.get("/ready", tags=["Root"])
+async def read_ready():
+    """Readiness check for load balancers: 503 while the background MongoDB health check is failing."""
+    if not db_manager.healthy:
+        return ORJSONResponse(status_code=503, content={"status": "unavailable", "database": "unreachable"})
+    return {"status": "ok", "database": "ok"}
+
 # --- Run with Uvicorn (for local development) ---
-# You would typically run this using: uvicorn api.main:app --reload
+# You would typically run this using: uvicorn api.main:app --reload --loop uvloop --http httptools
+# For production, run multiple workers under gunicorn (uvloop/httptools are picked up automatically):
+#   gunicorn api.main:app -k uvicorn.workers.UvicornWorker -w $((2 * $(nproc) + 1))
+# Each worker opens its own MongoDB pool (mongodb_max_pool_size), so size the pool per worker.
+# Avoid --preload: the Gemini client is created at import and must not be shared across forks.
 # Example run block (optional, usually run via command line)
 if __name__ == "__main__":
     import uvicorn
-    from core.config import settings
     # Note: settings.host and settings.port are examples,
     # ensure they are defined in your Settings model if you use them here.
     uvicorn.run(
         "api.main:app",
         host=getattr(settings, 'host', "127.0.0.1"),
         port=getattr(settings, 'port', 8000),
+        loop="uvloop", # libuv-based event loop (requires uvicorn[standard])
+        http="httptools", # C HTTP parser instead of pure-Python h11
         reload=True # Enable auto-reload for development
     )
\ No newline at end of file
@@ -1,34 +1,38 @@
 # api/routers/anonymous.py
-from fastapi import APIRouter, HTTPException, status, Body
-from fastapi.responses import JSONResponse # Import JSONResponse
-from models.anonymous import AnonymousRequest, AnonymousResponse # Import request/response models
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse # Import response classes
+from models.anonymous import AnonymousRequest, AnonymousResponse, ANON_REQ_ADAPTER # Import request/response models
+from core.request_body import json_body, json_body_openapi # Prebuilt body validation
 from services import anonymous_service # Import the service logic
-import logging
+from typing import AsyncIterator
+import structlog
+import orjson
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(module=__name__) # Lazily bound; configured in api/main.py
 router = APIRouter()
 
 @router.post(
     "/anonymous",
-    # We don't use response_model here because we construct JSONResponse manually
+    # We don't use response_model here because we construct ORJSONResponse manually
     # response_model=AnonymousResponse, # Can still define for docs if desired
     summary="Generate Anonymous Reflection",
     description="Generates a reflection based on the provided prompt and emotion score, without saving any data.",
-    tags=["Anonymous"] # Tag for Swagger UI
+    tags=["Anonymous"], # Tag for Swagger UI
+    openapi_extra=json_body_openapi(AnonymousRequest) # Body is parsed by json_body, document it manually
 )
 async def create_anonymous_reflection(
-    item: AnonymousRequest = Body(...)
+    item: AnonymousRequest = Depends(json_body(ANON_REQ_ADAPTER))
 ):
     """
     API endpoint to generate an anonymous reflection.
     Accepts prompt and emotions in the request body.
     Does not store any user data.
     """
-    logger.debug("POST /anonymous received.")
+    logger.debug("anonymous_received")
     try:
         reflection = await anonymous_service.process_anonymous_reflection(item)
         # Return the specific JSON structure expected ("status" and "reflection")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "status": "success",
@@ -40,8 +44,43 @@ async def create_anonymous_reflection(
         raise http_exc
     except Exception as e:
         # Catch unexpected errors
-        logger.error(f"Unexpected error in POST /anonymous: {e}", exc_info=True)
+        logger.error("anonymous_failed", error=str(e), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while generating the reflection."
-        )
\ No newline at end of file
+        )
+
+async def _sse_events(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Formats reflection chunks as Server-Sent Events, ending with a 'done' or 'error' event."""
+    try:
+        async for chunk in chunks:
+            yield b"data: " + orjson.dumps({"chunk": chunk}) + b"\n\n"
+        yield b"event: done\ndata: {}\n\n"
+    except Exception as e:
+        # Headers are already sent, so report failure in-band
+        logger.error("anonymous_stream_failed", error=str(e), exc_info=True)
+        yield b"event: error\ndata: " + orjson.dumps({"detail": "Could not generate reflection at this time. Please try again later."}) + b"\n\n"
+
+@router.post(
+    "/anonymous/stream",
+    summary="Stream Anonymous Reflection",
+    description="Streams a reflection as Server-Sent Events while it is generated, without saving any data. "
+                "Each event carries a JSON object {\"chunk\": <text>}; the stream ends with a 'done' or 'error' event.",
+    response_class=StreamingResponse,
+    tags=["Anonymous"],
+    openapi_extra=json_body_openapi(AnonymousRequest)
+)
+async def stream_anonymous_reflection(
+    item: AnonymousRequest = Depends(json_body(ANON_REQ_ADAPTER))
+):
+    """
+    API endpoint to stream an anonymous reflection (SSE).
+    Accepts prompt and emotions in the request body.
+    Does not store any user data.
+    """
+    logger.debug("anonymous_stream_received")
+    return StreamingResponse(
+        _sse_events(anonymous_service.stream_anonymous_reflection(item)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} # Disable proxy buffering
+    )
@@ -1,15 +1,16 @@
 # api/routers/dashboard.py
 from fastapi import APIRouter, Query, HTTPException, status
-from models.dashboard import EmotionalBreakdownResponse, WeeklyReflectionResponse# Import the response model
+from models.dashboard import DashboardBundleResponse, EmotionalBreakdownResponse, WeeklyReflectionResponse# Import the response model
 from services import dashboard_service # Import the service logic
-import logging
+from core.responses import fast_json # Pre-serialized JSON responses
+import structlog
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(module=__name__) # Lazily bound; configured in api/main.py
 router = APIRouter()
 
 @router.get(
     "/emotional_breakdown",
-    response_model=EmotionalBreakdownResponse,
+    responses={200: {"model": EmotionalBreakdownResponse}}, # Docs only: no response_model, so output isn't re-validated
     summary="Get Emotional Analysis Results",
     description="Retrieves an analysis of the user's dominant emotions based on recent journal entries.",
     tags=["Dashboard"] # Optional: Tag for Swagger UI grouping
@@ -22,16 +23,16 @@ async def get_dashboard_emotions(
     API endpoint to get the user's emotional breakdown.
     Requires the User ID (UID) as a query parameter.
     """
-    logger.debug(f"GET /emotional_breakdown received for UID: {UID}")
+    logger.debug("emotional_breakdown_received", uid=UID)
     try:
         breakdown_data = await dashboard_service.get_emotional_breakdown(uid=UID)
-        return breakdown_data
+        return fast_json(breakdown_data)
     except HTTPException as http_exc:
         # Re-raise known HTTP errors from the service layer
         raise http_exc
     except Exception as e:
         # Catch unexpected errors
-        logger.error(f"Unexpected error in GET /emotional_breakdown for UID {UID}: {e}", exc_info=True)
+        logger.error("emotional_breakdown_failed", uid=UID, error=str(e), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while fetching the emotional breakdown."
@@ -39,7 +40,7 @@ async def get_dashboard_emotions(
 
 @router.get(
     "/weekly_reflection",
-    response_model=WeeklyReflectionResponse,
+    responses={200: {"model": WeeklyReflectionResponse}}, # Docs only: no response_model, so output isn't re-validated
     summary="Get Weekly Reflection Content",
     description="Retrieves the latest available weekly reflection content for the user.",
     tags=["Dashboard"]
@@ -51,17 +52,46 @@ async def get_dashboard_weekly_reflection(
     API endpoint to get the user's latest weekly reflection.
     Requires the User ID (UID) as a query parameter.
     """
-    logger.debug(f"GET /weekly_reflection received for UID: {UID}")
+    logger.debug("weekly_reflection_received", uid=UID)
     try:
         reflection_data = await dashboard_service.get_latest_weekly_reflection(uid=UID)
-        return reflection_data
+        return fast_json(reflection_data)
     except HTTPException as http_exc:
         # Re-raise known HTTP errors (like 404 Not Found) from the service layer
         raise http_exc
     except Exception as e:
         # Catch unexpected errors
-        logger.error(f"Unexpected error in GET /weekly_reflection for UID {UID}: {e}", exc_info=True)
+        logger.error("weekly_reflection_failed", uid=UID, error=str(e), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while fetching the weekly reflection."
         )
+
+@router.get(
+    "/bundle",
+    responses={200: {"model": DashboardBundleResponse}}, # Docs only: no response_model, so output isn't re-validated
+    summary="Get All Dashboard Content",
+    description="Retrieves the user's info, emotional breakdown and latest weekly reflection in a single, concurrently-fetched response.",
+    tags=["Dashboard"]
+)
+async def get_dashboard_bundle(
+    UID: str = Query(..., description="The unique identifier for the user.")
+):
+    """
+    API endpoint to get the user's info and both dashboard panels at once.
+    Requires the User ID (UID) as a query parameter. Missing panels are returned as null.
+    """
+    logger.debug("dashboard_bundle_received", uid=UID)
+    try:
+        bundle = await dashboard_service.get_dashboard_bundle(uid=UID)
+        return fast_json(bundle)
+    except HTTPException as http_exc:
+        # Re-raise known HTTP errors from the service layer
+        raise http_exc
+    except Exception as e:
+        # Catch unexpected errors
+        logger.error("dashboard_bundle_failed", uid=UID, error=str(e), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while fetching the dashboard."
+        )
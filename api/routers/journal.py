@@ -2,23 +2,41 @@
 from fastapi import APIRouter, Query, HTTPException, status, Depends
 from typing import List
 from services import journal_service # Import the service logic
-import logging
-import re # Import regex for validation pattern
+from core.responses import fast_json # Pre-serialized JSON responses
+import structlog
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(module=__name__) # Lazily bound; configured in api/main.py
 router = APIRouter()
 
-# --- Regular Expressions for Query Parameter Validation ---
-# Matches YYYY format (e.g., 2024)
-YEAR_REGEX = r"^\d{4}$"
-# Matches MM format (01-12)
-MONTH_REGEX = r"^(0[1-9]|1[0-2])$"
-# --- End Regex ---
+# --- Query Parameter Validators ---
+# Plain length/digit checks instead of regex patterns (year/month are fixed-width ASCII digits)
+def _parse_year(
+    year: str = Query(..., description="The target year in YYYY format (e.g., '2025').")
+) -> str:
+    """Validates the year query parameter (YYYY format, e.g., 2024)."""
+    if len(year) == 4 and year.isascii() and year.isdigit():
+        return year
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid year format: expected YYYY."
+    )
+
+def _parse_month(
+    month: str = Query(..., description="The target month in MM format (e.g., '02' for February).")
+) -> str:
+    """Validates the month query parameter (MM format, 01-12)."""
+    if len(month) == 2 and month.isascii() and month.isdigit() and 1 <= int(month) <= 12:
+        return month
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid month format: expected MM (01-12)."
+    )
+# --- End Validators ---
 
 
 @router.get(
     "/past_entries",
-    response_model=List[str], # Response is a list of date strings
+    response_model=List[str], # Response is a list of date strings (docs only: fast_json skips output validation)
     summary="Get Dates with Journal Entries",
     description="Retrieves a list of distinct dates (YYYY-MM-DD) that have journal entries "
                 "within a 5-month window (requested month ± 2 months) for the user.",
@@ -26,17 +44,15 @@ MONTH_REGEX = r"^(0[1-9]|1[0-2])$"
 )
 async def get_journal_past_entries(
     UID: str = Query(..., description="The unique identifier for the user."),
-    year: str = Query(..., description="The target year in YYYY format (e.g., '2025').",
-                      pattern=YEAR_REGEX), # Apply regex pattern validation
-    month: str = Query(..., description="The target month in MM format (e.g., '02' for February).",
-                       pattern=MONTH_REGEX) # Apply regex pattern validation
+    year: str = Depends(_parse_year), # YYYY format validation
+    month: str = Depends(_parse_month) # MM format validation
 ):
     """
     API endpoint to get dates with journal entries for a specific month span.
     Requires UID, year (YYYY), and month (MM) as query parameters.
     """
-    logger.debug(f"GET /past_entries received for UID: {UID}, Year: {year}, Month: {month}")
-    # Basic format validation is handled by pattern in Query.
+    logger.debug("past_entries_received", uid=UID, year=year, month=month)
+    # Basic format validation is handled by the _parse_year/_parse_month dependencies.
     # Service layer handles deeper validation (e.g., numeric conversion, range).
     try:
         dates = await journal_service.get_past_entry_dates(
@@ -44,13 +60,13 @@ async def get_journal_past_entries(
             year_str=year,
             month_str=month
         )
-        return dates
+        return fast_json(dates)
     except HTTPException as http_exc:
         # Re-raise known HTTP errors (like 400 Bad Request) from the service layer
         raise http_exc
     except Exception as e:
         # Catch unexpected errors
-        logger.error(f"Unexpected error in GET /past_entries for UID {UID}, {year}-{month}: {e}", exc_info=True)
+        logger.error("past_entries_failed", uid=UID, year=year, month=month, error=str(e), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while fetching past entry dates."
@@ -1,15 +1,17 @@
 # api/routers/user.py
-from fastapi import APIRouter, Query, HTTPException, status, Body
-from models.user import UserCreate, UserResponse # Import API models
+from fastapi import APIRouter, Query, HTTPException, status, Depends
+from models.user import UserCreate, UserResponse, USER_CREATE_ADAPTER # Import API models
+from core.request_body import json_body, json_body_openapi # Prebuilt body validation
 from services import user_service # Import the service logic
-import logging
+from core.responses import fast_json # Pre-serialized JSON responses
+import structlog
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(module=__name__) # Lazily bound; configured in api/main.py
 router = APIRouter()
 
 @router.get(
     "/user_init",
-    response_model=UserResponse,
+    responses={200: {"model": UserResponse}}, # Docs only: no response_model, so output isn't re-validated
     summary="Get Existing User Data",
     description="Retrieves data for an existing user based on their UID.",
     tags=["User"] # Optional: Tag for Swagger UI grouping
@@ -22,16 +24,16 @@ async def get_user(
     API endpoint to get user data.
     Uses UID from query parameters.
     """
-    logger.debug(f"GET /user_init received for UID: {UID}")
+    logger.debug("get_user_received", uid=UID)
     try:
         user_info = await user_service.get_user_info(uid=UID)
-        return user_info
+        return fast_json(user_info)
     except HTTPException as http_exc:
         # Re-raise HTTPException from the service layer
         raise http_exc
     except Exception as e:
         # Catch any unexpected errors from the service layer or below
-        logger.error(f"Unexpected error in GET /user_init for UID {UID}: {e}", exc_info=True)
+        logger.error("get_user_failed", uid=UID, error=str(e), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while fetching user data."
@@ -39,32 +41,33 @@ async def get_user(
 
 @router.post(
     "/user_init",
-    response_model=UserResponse,
+    responses={201: {"model": UserResponse}}, # Docs only: no response_model, so output isn't re-validated
     status_code=status.HTTP_201_CREATED, # Set default success status code
     summary="Add New User",
     description="Creates a new user record if the UID doesn't already exist.",
-    tags=["User"]
+    tags=["User"],
+    openapi_extra=json_body_openapi(UserCreate) # Body is parsed by json_body, document it manually
 )
 async def create_user(
-    # Use Body(...) or just the model type hint for the request body
-    user_data: UserCreate = Body(...)
+    # Body is validated straight from raw JSON bytes by a prebuilt TypeAdapter
+    user_data: UserCreate = Depends(json_body(USER_CREATE_ADAPTER))
 ):
     """
     API endpoint to create a new user.
     Uses UserCreate model from request body.
     """
-    logger.debug(f"POST /user_init received for UID: {user_data.UID}")
+    logger.debug("create_user_received", uid=user_data.UID)
     try:
         new_user_info = await user_service.register_user(user_create_data=user_data)
-        # If successful, return the 201 status code set in the decorator
-        return new_user_info
+        # If successful, return the 201 status code (set explicitly since we build the Response)
+        return fast_json(new_user_info, status_code=status.HTTP_201_CREATED)
     except HTTPException as http_exc:
         # Re-raise HTTPException (like 409 Conflict) from the service layer
         # Ensure appropriate status code is propagated
         raise http_exc
     except Exception as e:
          # Catch any unexpected errors
-        logger.error(f"Unexpected error in POST /user_init for UID {user_data.UID}: {e}", exc_info=True)
+        logger.error("create_user_failed", uid=user_data.UID, error=str(e), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while creating the user."
@@ -1,26 +1,71 @@
 # core/config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
-from dotenv import load_dotenv
-import os
+from typing import List, Literal
+
+# Gemini service tiers accepted by the settings below (gemini_handler builds one config per tier)
+ServiceTier = Literal["standard", "priority", "flex"]
 
-load_dotenv()  # Load environment variables from .env file
 class Settings(BaseSettings):
     """
     Application settings loaded from .env file or environment variables.
     """
     # MongoDB Settings
-    mongodb_uri: str = os.getenv("MONGODB_URI")
-    mongodb_db_name: str = os.getenv("MONGODB_DB_NAME")
+    mongodb_uri: str
+    mongodb_db_name: str
+    # MongoDB connection pool tuning
+    mongodb_max_pool_size: int = 50
+    mongodb_min_pool_size: int = 10
+    mongodb_max_idle_time_ms: int = 30000
+    mongodb_server_selection_timeout_ms: int = 3000
+    mongodb_compressors: str = "zstd,snappy,zlib" # Wire compression, negotiated with the server in order
+    mongodb_health_check_interval_s: float = 30.0 # Background ping interval
+
+    # Dashboard result caching (process-local, per UID)
+    dashboard_cache_ttl_s: float = 60.0
+    dashboard_cache_maxsize: int = 10_000
+
+    # Per-process user lookup cache (opt-in; off by default so dev edits show up immediately)
+    user_cache_enabled: bool = False
+    user_cache_ttl_s: float = 60.0
+    user_cache_maxsize: int = 10_000
 
     # Gemini API Key
-    gemini_api_key: str = os.getenv("GEMINI_API_KEY")
+    gemini_api_key: str
+    # Per-request Gemini timeout in milliseconds (applied by the SDK to every call)
+    gemini_timeout_ms: int = 30_000
+    # Max concurrent Gemini calls for bulk generation (keeps bursts within quota)
+    gemini_max_concurrency: int = 20
+    # Input caps for emotion breakdown (bounds tokens, cost and latency per call)
+    max_prompts: int = 30 # Most recent entries kept
+    max_chars_per_prompt: int = 500
+    # Emotion breakdown prompts are analyzed in windows of this many entries, in parallel
+    emotion_window_size: int = 20
+    emotion_window_concurrency: int = 4
+    # In-process exact-match cache of Gemini emotion breakdowns (keyed by prompt hash)
+    gemini_emotion_cache_ttl_s: float = 3600.0
+    gemini_emotion_cache_maxsize: int = 1024
+    # Gemini service tiers (opt-in): "standard" sends no tier field. "priority" (user-facing) and
+    # "flex" (bulk) are sent as an undocumented request-body field not modeled by the pinned
+    # SDK; only enable them after checking the real endpoint accepts them.
+    # Typed as ServiceTier so a typo (e.g. "Priority") fails at startup, not on every request
+    gemini_interactive_service_tier: ServiceTier = "standard"
+    gemini_batch_service_tier: ServiceTier = "standard"
+
+    # CORS allowlist, e.g. ALLOWED_ORIGINS='["https://app.example.com"]' (JSON list)
+    allowed_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
+
+    # Root log level (e.g., "DEBUG" for local development)
+    log_level: str = "INFO"
+
+    # Threadpool size for sync dependencies and to_thread offloads (anyio default: 40)
+    threadpool_size: int = 100
 
     # FastAPI/Uvicorn Settings (Optional examples)
     # host: str = "127.0.0.1"
     # port: int = 8000
 
-    # Tells pydantic-settings to load from a .env file
+    # Tells pydantic-settings to load from a .env file (parsed once, on first get_settings())
     model_config = SettingsConfigDict(
         env_file='.env',
         env_file_encoding='utf-8',
@@ -28,16 +73,15 @@ class Settings(BaseSettings):
     )
 
 # Use lru_cache to load settings only once
+# Usage: from core.config import get_settings; settings = get_settings()
 @lru_cache
 def get_settings() -> Settings:
     """Returns the application settings."""
     return Settings()
 
-# Make settings easily accessible
-settings = get_settings()
-
 # Example usage (optional, just for testing):
 # if __name__ == "__main__":
+#     settings = get_settings()
 #     print("Loaded Settings:")
 #     print(f"MongoDB URI: {settings.mongodb_uri}")
 #     print(f"MongoDB DB Name: {settings.mongodb_db_name}")
@@ -1,28 +1,79 @@
 # core/db.py
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from .config import settings # Import settings from config.py
+from .config import get_settings # Import settings accessor from config.py
+
+settings = get_settings()
 
 class Database:
     """Handles MongoDB connection and provides access to the database."""
     client: AsyncIOMotorClient | None = None
     db: AsyncIOMotorDatabase | None = None
+    healthy: bool = False # Updated by connect_db and the background health check; served by GET /ready
+    _connect_lock: asyncio.Lock = asyncio.Lock() # Serializes (re)connection attempts
+    _health_task: asyncio.Task | None = None
 
     async def connect_db(self):
         """Establish database connection."""
         print("Connecting to MongoDB...")
-        self.client = AsyncIOMotorClient(settings.mongodb_uri)
+        # Long-lived, explicitly sized pool kept open for the whole app lifespan
+        self.client = AsyncIOMotorClient(
+            settings.mongodb_uri,
+            maxPoolSize=settings.mongodb_max_pool_size,
+            minPoolSize=settings.mongodb_min_pool_size,
+            maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+            serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+            retryWrites=True,
+            compressors=settings.mongodb_compressors
+        )
         self.db = self.client[settings.mongodb_db_name]
-        # Optional: Ping the server to confirm connection
+        # Ping the server to confirm connection. Concurrent pings force the
+        # driver to open (and authenticate) up to minPoolSize connections now,
+        # so the first real requests don't pay the handshake cost.
         try:
-             await self.client.admin.command('ping')
+             await asyncio.gather(
+                 *(self.client.admin.command('ping') for _ in range(max(1, settings.mongodb_min_pool_size)))
+             )
+             self.healthy = True
              print("Successfully connected to MongoDB!")
         except Exception as e:
+             self.healthy = False
              print(f"MongoDB connection failed: {e}")
              # Decide how to handle connection failure - exit, retry, etc.
              # For now, we'll let it proceed but db might be None
 
+    async def _health_loop(self, interval: float):
+        """Periodically pings the server, keeping the request path free of health checks."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.client.admin.command('ping')
+                if not self.healthy:
+                    print("MongoDB connection recovered.")
+                self.healthy = True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.healthy:
+                    print(f"MongoDB health check failed: {e}")
+                self.healthy = False
+
+    def start_health_check(self):
+        """Starts the background health check task (call once from the app lifespan)."""
+        if self._health_task is None and self.client is not None:
+            self._health_task = asyncio.create_task(
+                self._health_loop(settings.mongodb_health_check_interval_s)
+            )
+
     async def close_db(self):
         """Close database connection."""
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
         if self.client:
             print("Closing MongoDB connection...")
             self.client.close()
@@ -45,15 +96,20 @@ async def get_db() -> AsyncIOMotorDatabase:
     """
     Dependency function to get the database instance.
     Ensures the database is connected before returning.
+
+    The steady-state path is a plain attribute check; connection health is
+    tracked by the background task started in the app lifespan instead of
+    pinging here on every call.
     """
-    if db_manager.db is None:
-        # This might happen if connection failed initially.
-        # Consider reconnecting or raising an appropriate error.
-        # For simplicity now, we raise an error.
-        # In a real app, you might want more robust handling.
-        await db_manager.connect_db() # Attempt connection if not connected
+    if db_manager.db is not None:
+        return db_manager.db
+    # This might happen if connection was never established (e.g., outside lifespan).
+    # The lock ensures concurrent requests create a single client.
+    async with db_manager._connect_lock:
         if db_manager.db is None:
-             raise RuntimeError("Database connection is not available.")
+            await db_manager.connect_db() # Attempt connection if not connected
+    if db_manager.db is None:
+         raise RuntimeError("Database connection is not available.")
     return db_manager.db
 
 
@@ -0,0 +1,24 @@
+# core/log.py
+import logging
+import orjson
+import structlog
+
+
+def configure_logging(level: str = "INFO") -> None:
+    """
+    Configures structlog for JSON output rendered with orjson.
+
+    Uses a level-filtering bound logger, so calls below `level` (e.g., per-request
+    debug lines in production) return immediately without building the event dict.
+    """
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info, # Render exc_info=True tracebacks
+            structlog.processors.JSONRenderer(serializer=orjson.dumps)
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(level.upper())),
+        logger_factory=structlog.BytesLoggerFactory(), # orjson.dumps returns bytes
+        cache_logger_on_first_use=True
+    )
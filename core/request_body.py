@@ -0,0 +1,51 @@
+# core/request_body.py
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Any, Awaitable, Callable, Dict, Type, TypeVar
+from models.examples import OPENAPI_EXAMPLES
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body(adapter: TypeAdapter[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """
+    Builds a dependency that validates the raw request body with a prebuilt TypeAdapter.
+
+    The adapter parses JSON bytes directly in pydantic-core, skipping FastAPI's
+    per-request json.loads + model construction. Validation failures are raised as
+    RequestValidationError so clients still get FastAPI's standard 422 response.
+
+    Args:
+        adapter: A module-level TypeAdapter for the expected request model.
+
+    Returns:
+        An async dependency returning the validated model instance.
+    """
+    async def _dependency(request: Request) -> ModelT:
+        raw = await request.body()
+        try:
+            return adapter.validate_json(raw)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)],
+                body=raw
+            )
+    return _dependency
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Returns `openapi_extra` documenting `model` as the JSON request body.
+
+    Needed because bodies read via `json_body` are invisible to FastAPI's schema generation.
+    """
+    schema = model.model_json_schema()
+    if model.__name__ in OPENAPI_EXAMPLES:
+        schema["examples"] = OPENAPI_EXAMPLES[model.__name__]
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}}
+        }
+    }
@@ -0,0 +1,41 @@
+# core/responses.py
+from fastapi import Response, status
+from pydantic import BaseModel
+from models.base import FastModel
+from typing import Any
+import orjson
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for types orjson does not handle natively (e.g., ObjectId)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+
+def fast_json(obj: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Serializes a Pydantic model (or plain data) straight to a JSON Response.
+
+    Returning a Response from a handler bypasses FastAPI's jsonable_encoder and
+    response_model handling entirely, so Pydantic validators are NOT executed
+    on the output. Only use this for data already validated by the service layer.
+
+    Args:
+        obj: A Pydantic model (FastModel subclasses use their own to_bytes()),
+             or any orjson-serializable value (dict, list, ...).
+        status_code: The HTTP status code for the response (default: 200).
+
+    Returns:
+        A Response with the pre-serialized JSON body.
+    """
+    if isinstance(obj, FastModel):
+        body = obj.to_bytes()
+    else:
+        content = obj.model_dump() if isinstance(obj, BaseModel) else obj
+        body = orjson.dumps(content, default=_default)
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json"
+    )
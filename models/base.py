@@ -0,0 +1,12 @@
+# models/base.py
+from pydantic import BaseModel, ConfigDict
+
+class FastModel(BaseModel):
+    """Base model for API responses that are serialized straight to JSON bytes."""
+    # Applied by pydantic-core's JSON serializer, i.e. both model_dump_json() and to_bytes()
+    model_config = ConfigDict(ser_json_timedelta='iso8601', ser_json_bytes='utf8')
+
+    def to_bytes(self) -> bytes:
+        """Returns the model as JSON bytes, bypassing FastAPI's jsonable_encoder."""
+        # Serializes in pydantic-core directly (no intermediate dict), so every field type is handled
+        return self.__pydantic_serializer__.to_json(self, by_alias=True)
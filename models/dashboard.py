@@ -1,6 +1,8 @@
 # models/dashboard.py
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
+from models.base import FastModel
+from models.user import UserResponse
 
 class EmotionPercentage(BaseModel):
     """Represents a single emotion and its percentage."""
@@ -8,7 +10,7 @@ class EmotionPercentage(BaseModel):
     # Use float for percentage to allow decimals if needed
     percentage: float = Field(..., description="Percentage value for this emotion (0-100)")
 
-class EmotionalBreakdownResponse(BaseModel):
+class EmotionalBreakdownResponse(FastModel):
     """Response model for the emotional breakdown endpoint."""
     emotions: List[EmotionPercentage] = Field(
         ...,
@@ -17,30 +19,13 @@ class EmotionalBreakdownResponse(BaseModel):
         max_length=5  # Pydantic v2 validator, works for lists
     )
 
-    model_config = {
-        "json_schema_extra": {
-            "examples": [
-                {
-                    "emotions": [
-                        {"emotion": "Happy", "percentage": 40.0},
-                        {"emotion": "Sad", "percentage": 30.0},
-                        {"emotion": "Calm", "percentage": 30.0}
-                    ]
-                }
-            ]
-        }
-    }
-
 # Add models for Weekly Reflection later
-class WeeklyReflectionResponse(BaseModel):
+class WeeklyReflectionResponse(FastModel):
     reflection: str = Field(..., description="The text content of the weekly reflection.")
 
-    model_config = {
-      "json_schema_extra": {
-          "examples": [
-              {
-                  "reflection": "This week I felt more balanced and productive, noticing a pattern of..."
-              }
-          ]
-      }
-    }
+
+class DashboardBundleResponse(FastModel):
+    """Response model combining the user's info and both dashboard panels in one round-trip."""
+    user: Optional[UserResponse] = Field(None, description="The user's profile and streaks, or null if the user is not registered.")
+    emotional_breakdown: Optional[EmotionalBreakdownResponse] = Field(None, description="The emotional breakdown, or null if no recent journals exist.")
+    weekly_reflection: Optional[WeeklyReflectionResponse] = Field(None, description="The latest weekly reflection, or null if none exists yet.")
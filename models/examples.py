@@ -0,0 +1,60 @@
+# models/examples.py
+from typing import Any, Dict, List
+
+# OpenAPI examples keyed by model (schema) name.
+# Kept out of the models' model_config and attached when the OpenAPI schema is generated.
+OPENAPI_EXAMPLES: Dict[str, List[Dict[str, Any]]] = {
+    "AnonymousRequest": [
+        {
+            "prompt": "Feeling a bit overwhelmed today with all the tasks.",
+            "emotions": 2
+        }
+    ],
+    "AnonymousResponse": [
+        {
+            "reflection": "It sounds like you're carrying a heavy load. Remember to breathe and take things one step at a time."
+        }
+    ],
+    "EmotionalBreakdownResponse": [
+        {
+            "emotions": [
+                {"emotion": "Happy", "percentage": 40.0},
+                {"emotion": "Sad", "percentage": 30.0},
+                {"emotion": "Calm", "percentage": 30.0}
+            ]
+        }
+    ],
+    "WeeklyReflectionResponse": [
+        {
+            "reflection": "This week I felt more balanced and productive, noticing a pattern of..."
+        }
+    ],
+    "DashboardBundleResponse": [
+        {
+            "user": {
+                "UID": "user-123-abc",
+                "Uname": "Gary",
+                "Ustreak": 15,
+                "UL_streak": 2
+            },
+            "emotional_breakdown": {
+                "emotions": [
+                    {"emotion": "Happy", "percentage": 40.0},
+                    {"emotion": "Sad", "percentage": 30.0},
+                    {"emotion": "Calm", "percentage": 30.0}
+                ]
+            },
+            "weekly_reflection": {
+                "reflection": "This week I felt more balanced and productive, noticing a pattern of..."
+            }
+        }
+    ],
+    "UserResponse": [
+        {
+            "UID": "user-123-abc",
+            "Uname": "Gary",
+            "Ustreak": 15,
+            "UL_streak": 2
+        }
+    ],
+}
@@ -1,6 +1,7 @@
 # models/user.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional
+from models.base import FastModel
 
 class UserBase(BaseModel):
     """Base model for user data, excluding sensitive info if any."""
@@ -12,7 +13,10 @@ class UserCreate(UserBase):
     # Inherits UID and Uname
     pass
 
-class UserResponse(UserBase):
+# Prebuilt validator for the POST /user_init request body (reused across requests)
+USER_CREATE_ADAPTER = TypeAdapter(UserCreate)
+
+class UserResponse(UserBase, FastModel):
     """Model for returning user data via GET /user_init or after POST."""
     # Inherits UID and Uname
     Ustreak: int = Field(..., description="Main consecutive daily entry streak")
@@ -21,19 +25,6 @@ class UserResponse(UserBase):
     # Optional: Add other fields if needed later, e.g., account creation date
     # account_created_at: Optional[datetime] = None
 
-    model_config = {
-        "json_schema_extra": {
-            "examples": [
-                {
-                    "UID": "user-123-abc",
-                    "Uname": "Gary",
-                    "Ustreak": 15,
-                    "UL_streak": 2
-                }
-            ]
-        }
-    }
-
 class UserInDB(UserBase):
     """Model representing user data as stored in MongoDB."""
     # Inherits UID and Uname
@@ -2,7 +2,7 @@
 from fastapi import HTTPException, status
 from models.anonymous import AnonymousRequest # Import the request model
 from services.external import gemini_handler # Import the Gemini handler
-from typing import Optional
+from typing import AsyncIterator, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,4 +35,21 @@ async def process_anonymous_reflection(request_data: AnonymousRequest) -> str:
         )
 
     logger.info("Successfully processed anonymous reflection request.")
-    return reflection_text
\ No newline at end of file
+    return reflection_text
+
+def stream_anonymous_reflection(request_data: AnonymousRequest) -> AsyncIterator[str]:
+    """
+    Service function to stream an anonymous reflection as it is generated.
+
+    Args:
+        request_data: The incoming request data containing prompt and emotions.
+
+    Returns:
+        An async iterator of reflection text chunks. Errors surface while iterating
+        (as RuntimeError), i.e. after the response has started.
+    """
+    logger.info("Processing streamed anonymous reflection request.")
+    return gemini_handler.stream_single_reflection_async(
+        prompt=request_data.prompt,
+        emotions=request_data.emotions
+    )
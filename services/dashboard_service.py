@@ -1,11 +1,29 @@
 # services/dashboard_service.py
 from fastapi import HTTPException, status
-from models.dashboard import EmotionalBreakdownResponse, EmotionPercentage, WeeklyReflectionResponse # Import response models
+from models.dashboard import DashboardBundleResponse, EmotionalBreakdownResponse, EmotionPercentage, WeeklyReflectionResponse # Import response models
 from services.external import mongodb_handler, gemini_handler # Import handlers
+from services import user_service
+from core.config import get_settings
 from typing import List, Dict, Optional # Import necessary types
+from cachetools import TTLCache
+from pydantic import ValidationError
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# --- Process-local TTL caches keyed on UID ---
+# Dashboard pages poll these endpoints; short-lived caching skips repeat MongoDB/Gemini round-trips.
+# Only successful results are cached (errors propagate as HTTPException and are not stored).
+_breakdown_cache: TTLCache = TTLCache(maxsize=settings.dashboard_cache_maxsize, ttl=settings.dashboard_cache_ttl_s)
+_weekly_reflection_cache: TTLCache = TTLCache(maxsize=settings.dashboard_cache_maxsize, ttl=settings.dashboard_cache_ttl_s)
+
+def invalidate_dashboard_cache(uid: str) -> None:
+    """Drops cached dashboard results for a user (call after writing new journals/reflections)."""
+    _breakdown_cache.pop(uid, None)
+    _weekly_reflection_cache.pop(uid, None)
+# --- End Caches ---
 
 async def get_emotional_breakdown(uid: str) -> EmotionalBreakdownResponse:
     """
@@ -24,18 +42,23 @@ async def get_emotional_breakdown(uid: str) -> EmotionalBreakdownResponse:
     """
     logger.info(f"Getting emotional breakdown for UID: {uid}")
 
+    cached: Optional[EmotionalBreakdownResponse] = _breakdown_cache.get(uid)
+    if cached is not None:
+        logger.debug(f"Emotional breakdown cache hit for UID: {uid}")
+        return cached
+
     # 1. Get recent journals from DB (e.g., past 7 days)
-    recent_journals: List[Dict] = await mongodb_handler.get_journals_for_user_past_days(uid, days=7)
+    recent_prompts: List[str] = await mongodb_handler.get_journals_for_user_past_days(uid, days=7)
 
-    if not recent_journals:
+    if not recent_prompts:
         logger.warning(f"No recent journal entries found for UID {uid} to generate emotion breakdown.")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No recent journal entries found to perform emotional analysis."
         )
 
-    # 2. Extract prompts (ensure 'prompt' field exists and is not empty)
-    prompts = [journal.get("prompt", "") for journal in recent_journals if journal.get("prompt")]
+    # 2. Truncate, deduplicate (identical prompts sent once with an (xN) suffix) and cap the prompts
+    prompts: List[str] = gemini_handler.prepare_emotion_prompts(recent_prompts)
     if not prompts:
         logger.error(f"Journals found for UID {uid}, but failed to extract any valid prompts.")
         raise HTTPException(
@@ -43,106 +66,76 @@ async def get_emotional_breakdown(uid: str) -> EmotionalBreakdownResponse:
             detail="Failed to process journal entries for analysis."
         )
 
-    # 3. Call Gemini for analysis
-    logger.debug(f"Calling Gemini for emotion analysis with {len(prompts)} prompts for UID {uid}.")
-    emotion_results: Optional[Dict[str, float]] = await gemini_handler.generate_emotion_breakdown_async(prompts)
-
-    if emotion_results is None:
-        logger.error(f"Gemini analysis failed for UID {uid}.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate emotional breakdown from AI analysis."
+    # 3. Reuse a recent analysis of this exact prompt set, if it still forms a valid response:
+    # first from the in-process Gemini response cache, then from the DB cache (both keyed on what Gemini is sent)
+    cache_key = gemini_handler.emotion_cache_key(prompts)
+    response: Optional[EmotionalBreakdownResponse] = None
+    cached_results: Optional[Dict[str, float]] = gemini_handler.get_cached_emotion_breakdown(cache_key)
+    if cached_results is not None:
+        response = _build_breakdown_response(uid, cached_results) # Only valid breakdowns are cached there
+    else:
+        cached_results = await mongodb_handler.get_cached_emotion_breakdown(cache_key)
+        if cached_results is not None:
+            response = _build_breakdown_response(uid, cached_results)
+            if response is not None:
+                logger.debug(f"Emotion breakdown DB cache hit for UID {uid} (key {cache_key}).")
+            else:
+                logger.warning(f"Ignoring invalid cached emotion breakdown for UID {uid} (key {cache_key}).")
+
+    # 4. Otherwise call Gemini; only validated results are written to the DB cache
+    if response is None:
+        logger.debug(f"Calling Gemini for emotion analysis with {len(prompts)} prompts for UID {uid}.")
+        emotion_results = await gemini_handler.generate_emotion_breakdown_async(
+            prompts,
+            service_tier=settings.gemini_interactive_service_tier, # User-facing tier ("standard" unless opted in)
+            cache_key=cache_key
         )
 
-    # 4. Format results into response model list
-    emotion_list: List[EmotionPercentage] = []
-    for name, percent in emotion_results.items():
-         try:
-             # Basic validation can happen here too if needed, though Pydantic model handles structure
-             emotion_list.append(EmotionPercentage(emotion=name, percentage=percent))
-         except Exception as e: # Catch potential errors creating EmotionPercentage
-             logger.warning(f"Skipping invalid emotion data ('{name}': {percent}) for UID {uid}. Error: {e}")
-             continue # Skip this item and continue with others
-
-    if not emotion_list:
-        logger.error(f"Emotion analysis result for UID {uid} was empty after formatting.")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="AI analysis returned no valid emotions."
+        if emotion_results is None:
+            logger.error(f"Gemini analysis failed for UID {uid}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate emotional breakdown from AI analysis."
             )
 
-    # 5. Create final response object (Pydantic validates list length here)
-    try:
-        # Pydantic model EmotionalBreakdownResponse handles min/max length validation
-        response = EmotionalBreakdownResponse(emotions=emotion_list)
-        logger.info(f"Successfully generated emotional breakdown for UID: {uid} with {len(emotion_list)} emotions.")
-        return response
-    except Exception as validation_error: # Catch Pydantic validation errors (e.g., list length)
-         logger.error(f"Validation error creating EmotionalBreakdownResponse for UID {uid}: {validation_error}", exc_info=True)
-         # Provide more specific feedback if possible, e.g., about list length
-         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            # Customize detail based on validation error if needed
-            detail=f"Failed to format emotional breakdown response: {validation_error}"
-         )
+        response = _build_breakdown_response(uid, emotion_results)
+        if response is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="AI analysis did not return 3 to 5 valid emotions."
+            )
+        await mongodb_handler.store_emotion_breakdown(cache_key, uid, emotion_results)
 
+    logger.info(f"Successfully generated emotional breakdown for UID: {uid} with {len(response.emotions)} emotions.")
+    _breakdown_cache[uid] = response
+    return response
 
-# --- Placeholder for Weekly Reflection Service ---
-async def get_latest_weekly_reflection(uid: str) -> WeeklyReflectionResponse:
+
+def _build_breakdown_response(uid: str, emotion_results: Dict[str, float]) -> Optional[EmotionalBreakdownResponse]:
     """
-    Service function to retrieve the latest weekly reflection for a user.
+    Formats parsed emotions into a validated EmotionalBreakdownResponse.
 
     Args:
-        uid: The User Identifier.
-
-    Raises:
-        HTTPException(404): If no weekly reflection is found for the user.
-        HTTPException(500): If a database or other error occurs.
+        uid: The User Identifier (for logging).
+        emotion_results: Emotion name to percentage mapping, from Gemini or the DB cache.
 
     Returns:
-        WeeklyReflectionResponse: The latest weekly reflection content.
+        The response, or None if the results don't satisfy the 3-5 emotion constraint.
     """
-    logger.info(f"Getting latest weekly reflection for UID: {uid}")
-
-    # 1. Get latest reflection from DB
+    # The Gemini parser already guarantees str names and float percentages, so skip per-item validation
+    emotion_list: List[EmotionPercentage] = [
+        EmotionPercentage.model_construct(emotion=name, percentage=percent)
+        for name, percent in emotion_results.items()
+    ]
     try:
-        latest_reflection_doc: Optional[Dict] = await mongodb_handler.get_latest_weekly_reflection_for_user(uid)
-    except Exception as e:
-         logger.error(f"Database error retrieving weekly reflection for UID {uid}: {e}", exc_info=True)
-         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="A database error occurred while fetching the weekly reflection."
-         )
-
-    if latest_reflection_doc is None or "weekly_reflection" not in latest_reflection_doc:
-        logger.warning(f"No weekly reflection found in DB for UID {uid}.")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No weekly reflection found for this user."
-        )
+        # Pydantic model EmotionalBreakdownResponse handles min/max length validation
+        return EmotionalBreakdownResponse(emotions=emotion_list)
+    except ValidationError as validation_error: # e.g., list length outside 3-5
+        logger.error(f"Validation error creating EmotionalBreakdownResponse for UID {uid}: {validation_error}")
+        return None
 
-    # 2. Extract the reflection text (assuming field name is 'weekly_reflection')
-    reflection_text = latest_reflection_doc.get("weekly_reflection", "")
-    if not reflection_text:
-         logger.warning(f"Weekly reflection document found for UID {uid}, but the reflection text is empty.")
-         # Decide: return 404 or empty reflection? Let's return 404 as it's not useful.
-         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Weekly reflection content is empty."
-         )
-
-    # 3. Format response
-    try:
-        response = WeeklyReflectionResponse(reflection=reflection_text)
-        logger.info(f"Successfully retrieved latest weekly reflection for UID: {uid}")
-        return response
-    except Exception as validation_error: # Catch Pydantic validation errors
-         logger.error(f"Error creating Pydantic response model for weekly reflection (UID {uid}): {validation_error}", exc_info=True)
-         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to format weekly reflection response."
-         )
 
+# --- Weekly Reflection Service ---
 async def get_latest_weekly_reflection(uid: str) -> WeeklyReflectionResponse:
     """
     Service function to retrieve the latest stored weekly reflection for a user.
@@ -160,14 +153,16 @@ async def get_latest_weekly_reflection(uid: str) -> WeeklyReflectionResponse:
     """
     logger.info(f"Getting latest weekly reflection for UID: {uid}")
 
+    cached: Optional[WeeklyReflectionResponse] = _weekly_reflection_cache.get(uid)
+    if cached is not None:
+        logger.debug(f"Weekly reflection cache hit for UID: {uid}")
+        return cached
+
     # 1. Call the handler to get the latest reflection document from DB
     latest_reflection_doc: Optional[Dict] = await mongodb_handler.get_latest_weekly_reflection_for_user(uid)
 
-    # Handle case where DB query itself failed (handler returns None)
-    # Note: The handler logs the specific DB error. Here we raise 500.
-    # If handler returned None because *no document was found*, that's handled next.
-    # We might need more specific error signaling from handler if distinction is critical.
-    # Assuming None means either "not found" or "DB error".
+    # A rejected query (e.g. missing index) raises OperationFailure, which the router turns into a 500.
+    # None means either "not found" or a transient DB error (the handler logs the specific error).
 
     if latest_reflection_doc is None:
         # This could be "not found" OR a database error during the query.
@@ -195,10 +190,58 @@ async def get_latest_weekly_reflection(uid: str) -> WeeklyReflectionResponse:
     try:
         response = WeeklyReflectionResponse(reflection=str(reflection_text)) # Ensure it's a string
         logger.info(f"Successfully retrieved latest weekly reflection for UID: {uid}")
+        _weekly_reflection_cache[uid] = response
         return response
     except Exception as validation_error: # Catch potential Pydantic validation errors
          logger.error(f"Error creating Pydantic response model for weekly reflection (UID {uid}): {validation_error}", exc_info=True)
          raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to format weekly reflection response."
-         )
\ No newline at end of file
+         )
+
+
+# --- Dashboard Bundle Service ---
+_BUNDLE_BREAKDOWN_INDEX = 1 # Position of get_emotional_breakdown in the gather below
+
+async def get_dashboard_bundle(uid: str) -> DashboardBundleResponse:
+    """
+    Fetches the user's info, emotional breakdown and latest weekly reflection concurrently.
+
+    Latency is max(user, breakdown, reflection) instead of their sum. A 404 from any
+    part (unknown user / no journals / no reflection yet) leaves that field null. The
+    emotional breakdown depends on Gemini, so any error there (e.g. Gemini unreachable)
+    is logged and also leaves it null, rather than failing the panels that did load.
+    Other errors are propagated.
+
+    Args:
+        uid: The User Identifier.
+
+    Raises:
+        HTTPException: Any non-404 error raised while loading the user or weekly reflection.
+
+    Returns:
+        DashboardBundleResponse: The user and both dashboard panels (each possibly None).
+    """
+    logger.info(f"Getting dashboard bundle for UID: {uid}")
+    results = await asyncio.gather(
+        user_service.get_user_info(uid),
+        get_emotional_breakdown(uid),
+        get_latest_weekly_reflection(uid),
+        return_exceptions=True
+    )
+
+    parts = []
+    for index, result in enumerate(results):
+        if isinstance(result, HTTPException) and result.status_code == status.HTTP_404_NOT_FOUND:
+            parts.append(None)
+        elif isinstance(result, Exception) and index == _BUNDLE_BREAKDOWN_INDEX:
+            # AI analysis is best-effort in the bundle; the client can retry the standalone endpoint
+            logger.error(f"Emotional breakdown failed for UID {uid}; returning bundle without it: {result}")
+            parts.append(None)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            parts.append(result)
+
+    user, breakdown, reflection = parts
+    return DashboardBundleResponse.model_construct(user=user, emotional_breakdown=breakdown, weekly_reflection=reflection)
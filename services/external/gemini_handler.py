@@ -2,22 +2,45 @@
 # --- Use Imports based on User's V1/Preference ---
 from google import genai
 from google.genai import types # Import types for GenerateContentConfig
+from google.genai import errors as genai_errors
 # --- End Imports ---
 
-from core.config import settings
-from typing import List, Dict, Optional
+from core.config import ServiceTier, get_settings
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, get_args
+from cachetools import TTLCache
+from collections import Counter
+import asyncio
+import hashlib
+import httpx
+import io
 import logging
 import re
-import json
+import sys
+import time
+import orjson
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # --- Gemini Client Initialization (User manages errors/validation) ---
 # Using the genai.Client pattern EXACTLY as requested by the user
 client: Optional[genai.Client] = None
 try:
     # Initialize using the Client class from 'google.genai'
-    client = genai.Client(api_key=settings.gemini_api_key) # Or just genai.Client() if key is implicit
+    # The SDK keeps one httpx.AsyncClient for the life of `client`; tune it for
+    # HTTP/2 multiplexing and a keep-alive pool so calls reuse warm TLS connections.
+    # The timeout must be set via HttpOptions.timeout (milliseconds): the SDK passes it
+    # explicitly on every request, overriding any httpx client-level timeout.
+    client = genai.Client(
+        api_key=settings.gemini_api_key, # Or just genai.Client() if key is implicit
+        http_options=types.HttpOptions(
+            timeout=settings.gemini_timeout_ms,
+            async_client_args={
+                "http2": True,
+                "limits": httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            }
+        )
+    )
     logger.info("genai.Client object initialized via V1 pattern.")
     # Verify if client.aio exists, log warning if not
     if client and not hasattr(client, 'aio'):
@@ -30,21 +53,44 @@ except Exception as e:
     logger.error(f"Failed to initialize genai.Client: {e}", exc_info=True)
     client = None
 
+# Computed once so the hot path doesn't repeat the hasattr check on every call
+_CLIENT_READY: bool = client is not None and hasattr(client, 'aio')
+
 # Define model name (use the one from user's V1/example)
 # Ensure this model name is compatible with the Client API version you are using
 GEMINI_MODEL_NAME = "gemini-2.0-flash" # Or "gemini-2.0-flash" / "gemini-pro" etc.
 
+# Parses "Emotion-Percentage" pairs from the emotion breakdown response (compiled once at import).
+# The name must start with a letter and is matched lazily, so leading whitespace/newlines are
+# skipped by the scanner instead of being captured and backtracked over.
+_EMOTION_RE = re.compile(r"([A-Za-z][A-Za-z ]*?)\s*-\s*(\d+(?:\.\d+)?)")
+# Text after a match that could still be part of its number once more chunks arrive ("" / "." / ".5")
+_PENDING_NUMBER_RE = re.compile(r"[\d.]*")
+# Upper bound of emotions requested by SYSTEM_PROMPT_EMOTION_BREAKDOWN; parsing stops once reached
+_MAX_EMOTIONS = 5
+# Fewest emotions a usable breakdown has (EmotionalBreakdownResponse requires 3-5)
+_MIN_EMOTIONS = 3
+
 # --- System Prompts ---
-SYSTEM_PROMPT_EMOTION_BREAKDOWN = """
+SYSTEM_PROMPT_EMOTION_BREAKDOWN = sys.intern("""
 Analyze the provided journal entries. Identify the 3 to 5 most dominant emotions expressed.
 Output the result as a comma-separated list of key-value pairs, where the key is the emotion (adjective) and the value is its estimated percentage (integer).
 Example format: "Happy-30,Excited-23,Disappoint-12,Curiosity-20,Calm-15"
 Another example: "Sad-30,Self Criticizing-45,Demotivated-25"
 Ensure the percentages roughly reflect the emotional weight across all entries provided.
 The total percentage does not necessarily need to sum to 100. Focus on the relative prominence.
-"""
+""")
+
+# Structured-output variant; the response schema below enforces the shape
+SYSTEM_PROMPT_EMOTION_BREAKDOWN_JSON = sys.intern("""
+Analyze the provided journal entries. Identify the 3 to 5 most dominant emotions expressed.
+Output a JSON array of objects, each with the emotion name ("emotion", an adjective) and its estimated percentage ("percentage", integer).
+Example: [{"emotion": "Happy", "percentage": 30}, {"emotion": "Excited", "percentage": 23}, {"emotion": "Calm", "percentage": 15}]
+Ensure the percentages roughly reflect the emotional weight across all entries provided.
+The total percentage does not necessarily need to sum to 100. Focus on the relative prominence.
+""")
 
-SYSTEM_PROMPT_REFLECTION = """
+SYSTEM_PROMPT_REFLECTION = sys.intern("""
 You are a compassionate and insightful mental wellness companion. A user has just written a short journal entry (1 to 10 sentences). Your task is to provide a reflection that mirrors their emotion, offers gentle insight, or encouragement— something they may not have consciously realized. The reflection should feel like it comes from someone deeply attuned to their feelings and subconscious mind.
 Your response is recommended to be around 3 sentences.
 Speak with warmth, wisdom, and clarity.
@@ -56,96 +102,470 @@ This is not a summary. It is not a reply. It is a mirror
 Here are two example outputs for an idea of what is a good output
 1. “You’ve been holding it together — and that counts. Today was hard, but you still showed up.”
 2. “It's good you apologized. Acknowledge your stress, find healthy ways to release it, and rebuild trust with your friend through consistent actions.”
-"""
+""")
 # --- End System Prompts ---
 
+# --- Generation Configs (built once at import and reused for every call) ---
+# System prompts are pre-wrapped as Content so the SDK doesn't convert the str on each call
+_EMOTION_SYSTEM_CONTENT = types.Content(parts=[types.Part(text=SYSTEM_PROMPT_EMOTION_BREAKDOWN)])
+_EMOTION_JSON_SYSTEM_CONTENT = types.Content(parts=[types.Part(text=SYSTEM_PROMPT_EMOTION_BREAKDOWN_JSON)])
+_REFLECTION_SYSTEM_CONTENT = types.Content(parts=[types.Part(text=SYSTEM_PROMPT_REFLECTION)])
+# One config per service tier: "priority" (low latency, user-facing), "flex" (discounted,
+# latency-tolerant) and "standard" (the API default, sent without a tier field).
+# This SDK version has no service_tier config field, so a non-standard tier rides in the request
+# body (unverified against the live API; callers default to "standard", see core/config.py).
+SERVICE_TIERS = get_args(ServiceTier) # ("standard", "priority", "flex")
+
+def _build_tier_configs(system_content: types.Content, **config_kwargs: Any) -> Dict[str, types.GenerateContentConfig]:
+    """Builds one GenerateContentConfig per service tier for the given system instruction (and extra config fields)."""
+    return {
+        tier: types.GenerateContentConfig(
+            system_instruction=system_content,
+            http_options=None if tier == "standard" else types.HttpOptions(extra_body={"serviceTier": tier}),
+            **config_kwargs
+        )
+        for tier in SERVICE_TIERS
+    }
+
+# JSON schema for the structured emotion breakdown: 3-5 {"emotion", "percentage"} objects
+_EMOTION_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.ARRAY,
+    min_items=3,
+    max_items=_MAX_EMOTIONS,
+    items=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "emotion": types.Schema(type=types.Type.STRING),
+            "percentage": types.Schema(type=types.Type.NUMBER, minimum=0, maximum=100)
+        },
+        required=["emotion", "percentage"],
+        property_ordering=["emotion", "percentage"]
+    )
+)
+
+_EMOTION_CONFIGS = _build_tier_configs(_EMOTION_SYSTEM_CONTENT)
+_EMOTION_JSON_CONFIGS = _build_tier_configs(
+    _EMOTION_JSON_SYSTEM_CONTENT,
+    response_mime_type="application/json",
+    response_schema=_EMOTION_RESPONSE_SCHEMA
+)
+_REFLECTION_CONFIGS = _build_tier_configs(_REFLECTION_SYSTEM_CONTENT)
+# --- End Generation Configs ---
+
+# Whitespace and quotes trimmed from generated reflections in one str.strip pass
+_REFLECTION_STRIP_CHARS = ' \t\n\r"'
+
+# Set when the API rejects the response schema / JSON mime type; until then (monotonic time),
+# emotion breakdowns use the streamed regex path. Expires so a transient rejection isn't permanent.
+_json_output_disabled_until: float = 0.0
+_JSON_OUTPUT_RETRY_AFTER_S = 600.0
+# Substrings of a 400 message that identify a structured-output rejection (vs. bad input etc.)
+_SCHEMA_REJECTION_MARKERS = ("response_schema", "responseschema", "response_mime_type", "responsemimetype")
+
+
+def _is_schema_rejection(error: genai_errors.ClientError) -> bool:
+    """True if a ClientError is the API rejecting the JSON response schema or mime type."""
+    if error.code != 400:
+        return False
+    message = (error.message or str(error)).casefold()
+    return any(marker in message for marker in _SCHEMA_REJECTION_MARKERS)
+
+# Exact-match cache of parsed emotion breakdowns, keyed by sha256 of the truncated prompts.
+# Only breakdowns with _MIN_EMOTIONS.._MAX_EMOTIONS entries are stored. Only touched from the
+# event loop between awaits, so no lock is needed.
+_emotion_response_cache: TTLCache = TTLCache(maxsize=settings.gemini_emotion_cache_maxsize, ttl=settings.gemini_emotion_cache_ttl_s)
+
+# Emotion breakdown user prompt: prefix + entries joined by the separator
+_EMOTION_PROMPT_PREFIX = "Analyze the following journal entries:\n\n"
+_EMOTION_PROMPT_SEPARATOR = "\n---\n"
+
+# Unparsed text above this size is parsed in a worker thread instead of on the event loop
+_PARSE_OFFLOAD_THRESHOLD = 16 * 1024
+
+
+def _parse_emotion_text(buf: str, pos: int, final: bool, emotions_dict: Dict[str, float]) -> int:
+    """
+    Adds complete emotion-percentage matches from buf[pos:] to emotions_dict (sync, CPU-only).
+
+    Args:
+        buf: The response text received so far.
+        pos: Offset in buf where scanning resumes.
+        final: True once the stream has ended, so a match near the end of buf is complete.
+        emotions_dict: Accumulator of parsed emotions, mutated in place.
+
+    Returns:
+        The new scan position.
+    """
+    for match in _EMOTION_RE.finditer(buf, pos):
+        # A match followed only by digits/dots may be cut mid-number ("Happy-3" of "Happy-30",
+        # "Calm-10" of "Calm-10." + "5"); wait for a delimiter after the number before committing
+        if not final and _PENDING_NUMBER_RE.fullmatch(buf, match.end()):
+            break
+        pos = match.end()
+        name, percent_str = match.group(1), match.group(2)
+        try:
+            emotion_name = name.strip()
+            percentage = float(percent_str)
+            if 0 <= percentage <= 100:
+                 emotions_dict[emotion_name] = percentage
+            else:
+                 logger.warning(f"Parsed percentage {percentage} for emotion '{emotion_name}' is outside valid range (0-100). Skipping.")
+        except ValueError:
+            logger.warning(f"Could not convert percentage '{percent_str}' to float for emotion '{name}'. Skipping.")
+        if len(emotions_dict) >= _MAX_EMOTIONS:
+            break
+    return pos
+
+
+async def warm_up_async() -> None:
+    """
+    Opens the Gemini connection ahead of the first request (DNS, TLS, auth) with a
+    cheap model-metadata lookup. Failures are logged and ignored.
+    """
+    if not _CLIENT_READY:
+        logger.warning("Skipping Gemini warm-up: client or its 'aio' attribute is not available.")
+        return
+    try:
+        await client.aio.models.get(model=GEMINI_MODEL_NAME)
+        logger.info("Gemini client warmed up.")
+    except Exception as e:
+        logger.warning(f"Gemini warm-up failed (first request will pay connection setup): {e}")
+
+
+async def close_async() -> None:
+    """
+    Closes the Gemini client's pooled HTTP connections (call on app shutdown).
 
-async def generate_emotion_breakdown_async(journal_prompts: List[str]) -> Optional[Dict[str, float]]:
+    google-genai 1.24 exposes no public async close, so this closes the SDK's
+    internal httpx.AsyncClient directly.
     """
-    Analyzes prompts using client.aio.models.generate_content (V1 style - async)
-    to generate an emotional breakdown.
+    api_client = getattr(client, '_api_client', None)
+    httpx_client: Optional[httpx.AsyncClient] = getattr(api_client, '_async_httpx_client', None)
+    if httpx_client is None:
+        logger.warning("Gemini async HTTP client not found; nothing to close.")
+        return
+    try:
+        await httpx_client.aclose()
+        logger.info("Gemini client closed.")
+    except Exception as e:
+        logger.warning(f"Error closing Gemini client: {e}")
+
+
+async def _emotion_breakdown_window(window_prompts: List[str], service_tier: ServiceTier) -> Optional[Dict[str, float]]:
+    """
+    Runs one emotion-breakdown call over a window of prompts.
+
+    Uses JSON structured output. The streamed, regex-parsed text format is used for
+    a call whose schema the API rejects, and for the next _JSON_OUTPUT_RETRY_AFTER_S
+    seconds; other API errors fail the call without affecting later requests.
 
     Args:
-        journal_prompts: A list of journal entry texts.
+        window_prompts: The (already truncated) journal entry texts for this window.
+        service_tier: One of SERVICE_TIERS.
 
     Returns:
         A dictionary mapping emotion names to percentages, or None on failure.
 
     Raises:
-        RuntimeError: If the 'client' object is None or lacks the 'aio' attribute.
+        RuntimeError: If the client's async interface is missing the generation methods.
     """
-    if client is None or not hasattr(client, 'aio'):
-        logger.error("Gemini client (genai.Client) or its 'aio' attribute is not available for emotion breakdown.")
-        raise RuntimeError("Gemini client or its async interface failed to initialize.")
+    global _json_output_disabled_until
+    # One join builds the whole prompt: the prefix rides on the (short) first entry
+    full_prompt = _EMOTION_PROMPT_SEPARATOR.join([_EMOTION_PROMPT_PREFIX + window_prompts[0], *window_prompts[1:]])
+
+    if time.monotonic() >= _json_output_disabled_until:
+        logger.info(f"Requesting structured emotion breakdown via client.aio.models.generate_content for {len(window_prompts)} prompts...")
+        try:
+            return await _json_emotion_breakdown(full_prompt, service_tier)
+        except genai_errors.ClientError as e:
+            if not _is_schema_rejection(e):
+                logger.error(f"Error during Gemini API call for emotion breakdown: {e}", exc_info=True)
+                return None
+            logger.warning(f"Gemini rejected the emotion response schema ({e}); using text parsing for the next {_JSON_OUTPUT_RETRY_AFTER_S:.0f}s.")
+            _json_output_disabled_until = time.monotonic() + _JSON_OUTPUT_RETRY_AFTER_S
+
+    logger.info(f"Requesting emotion breakdown via client.aio.models.generate_content_stream for {len(window_prompts)} prompts...")
+    return await _stream_emotion_breakdown(full_prompt, service_tier)
 
-    if not journal_prompts:
-        logger.warning("generate_emotion_breakdown_async called with no prompts.")
-        return None
 
-    combined_prompts = "\n---\n".join(journal_prompts)
-    full_prompt = f"Analyze the following journal entries:\n\n{combined_prompts}"
-    logger.info(f"Requesting emotion breakdown via client.aio.models.generate_content for {len(journal_prompts)} prompts...")
+async def _json_emotion_breakdown(full_prompt: str, service_tier: ServiceTier) -> Optional[Dict[str, float]]:
+    """
+    Requests the breakdown as schema-constrained JSON and validates it.
+
+    Returns:
+        A dictionary mapping emotion names to percentages, or None on failure.
 
+    Raises:
+        genai_errors.ClientError: If the API rejects the request (e.g., unsupported schema).
+        RuntimeError: If the client's async interface is missing generate_content.
+    """
     try:
-        # --- Correct V1 Style Async Call using client.aio ---
-        config = types.GenerateContentConfig(
-             # Pass generation parameters here if needed
-        )
-        # Use client.aio for the async version of client.models.generate_content
         response = await client.aio.models.generate_content(
-            model=GEMINI_MODEL_NAME, # Pass model name directly if required by this method
+            model=GEMINI_MODEL_NAME,
+            contents=[full_prompt],
+            config=_EMOTION_JSON_CONFIGS[service_tier]
+        )
+    except genai_errors.ClientError:
+        raise # Caller decides whether to fall back to text parsing
+    except AttributeError as ae:
+         logger.error(f"AttributeError during client.aio.models.generate_content call: {ae}. Verify method existence and parameters.", exc_info=True)
+         raise RuntimeError(f"Gemini API async call failed: {ae}")
+    except Exception as e:
+        logger.error(f"Error during Gemini API call for emotion breakdown: {e}", exc_info=True)
+        return None
+
+    text = response.text if response else None
+    if not text:
+        logger.error("Received empty or invalid response from Gemini for emotion breakdown.")
+        return None
+    logger.debug(f"Gemini raw response for emotion breakdown: {text}")
+
+    try:
+        items = orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Gemini emotion breakdown was not valid JSON ({e}): '{text}'")
+        return None
+
+    emotions_dict: Dict[str, float] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        name, percentage = item.get("emotion"), item.get("percentage")
+        # bool is an int subclass; exclude it explicitly
+        if not isinstance(name, str) or not name.strip() or isinstance(percentage, bool) or not isinstance(percentage, (int, float)):
+            logger.warning(f"Skipping malformed emotion item: {item}")
+            continue
+        if not 0 <= percentage <= 100:
+            logger.warning(f"Parsed percentage {percentage} for emotion '{name}' is outside valid range (0-100). Skipping.")
+            continue
+        emotions_dict[name.strip()] = float(percentage)
+        if len(emotions_dict) >= _MAX_EMOTIONS:
+            break
+
+    if not emotions_dict:
+        logger.warning(f"Structured Gemini response yielded no valid emotion-percentage pairs: '{text}'")
+        return None
+    logger.info(f"Successfully parsed emotions: {emotions_dict}")
+    return emotions_dict
+
+
+async def _stream_emotion_breakdown(full_prompt: str, service_tier: ServiceTier) -> Optional[Dict[str, float]]:
+    """
+    Fallback: streams the comma-separated text format and parses it incrementally.
+
+    The stream is abandoned as soon as _MAX_EMOTIONS valid pairs have been read.
+
+    Returns:
+        A dictionary mapping emotion names to percentages, or None on failure.
+
+    Raises:
+        RuntimeError: If the client's async interface is missing generate_content_stream.
+    """
+    emotions_dict: Dict[str, float] = {}
+
+    async def _consume(buf: str, pos: int, final: bool) -> int:
+        """Parses buf[pos:] into emotions_dict, offloading to a thread when the pending text is large."""
+        if len(buf) - pos > _PARSE_OFFLOAD_THRESHOLD:
+            return await asyncio.to_thread(_parse_emotion_text, buf, pos, final, emotions_dict)
+        return _parse_emotion_text(buf, pos, final, emotions_dict)
+
+    try:
+        # --- Correct V1 Style Async Streaming Call using client.aio ---
+        stream = await client.aio.models.generate_content_stream(
+            model=GEMINI_MODEL_NAME,
             contents=[full_prompt],
-            generation_config=config
-            # System prompt might need to be handled differently for client API
-            # Check if config or generate_content accepts system_instruction
+            config=_EMOTION_CONFIGS[service_tier] # System prompt via shared config
         )
         # --- End Call ---
 
-        # --- Parsing Logic (remains the same) ---
-        if response and hasattr(response, 'text') and response.text:
-            logger.debug(f"Gemini raw response for emotion breakdown: {response.text}")
-            pattern = re.compile(r"([a-zA-Z\s]+)\s*-\s*(\d+(?:\.\d+)?)")
-            matches = pattern.findall(response.text)
-            if not matches:
-                 logger.warning(f"Could not parse Gemini emotion breakdown response: '{response.text}'")
-                 return None
-            emotions_dict = {}
-            for name, percent_str in matches:
-                try:
-                    emotion_name = name.strip()
-                    percentage = float(percent_str)
-                    if 0 <= percentage <= 100:
-                         emotions_dict[emotion_name] = percentage
-                    else:
-                         logger.warning(f"Parsed percentage {percentage} for emotion '{emotion_name}' is outside valid range (0-100). Skipping.")
-                except ValueError:
-                    logger.warning(f"Could not convert percentage '{percent_str}' to float for emotion '{name}'. Skipping.")
-                    continue
-            if not emotions_dict:
-                 logger.warning("Parsing Gemini response yielded no valid emotion-percentage pairs.")
-                 return None
-            logger.info(f"Successfully parsed emotions: {emotions_dict}")
-            return emotions_dict
+        # --- Incremental Parsing Logic ---
+        buf = ""
+        pos = 0
+        async for chunk in stream:
+            if chunk and chunk.text:
+                buf += chunk.text
+                pos = await _consume(buf, pos, final=False)
+                if len(emotions_dict) >= _MAX_EMOTIONS:
+                    break # Enough emotions; stop reading the rest of the response
         else:
-            logger.error(f"Received empty or invalid response from Gemini for emotion breakdown.")
+            await _consume(buf, pos, final=True) # Stream finished; trailing match is complete
+        # Release the underlying HTTP stream if we stopped early
+        aclose = getattr(stream, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+
+        if not buf:
+            logger.error("Received empty or invalid response from Gemini for emotion breakdown.")
             return None
+        logger.debug(f"Gemini raw response for emotion breakdown: {buf}")
+        if not emotions_dict:
+             logger.warning(f"Parsing Gemini response yielded no valid emotion-percentage pairs: '{buf}'")
+             return None
+        logger.info(f"Successfully parsed emotions: {emotions_dict}")
+        return emotions_dict
         # --- End Parsing Logic ---
 
     except AttributeError as ae:
-         logger.error(f"AttributeError during client.aio.models.generate_content call: {ae}. Verify method existence and parameters.", exc_info=True)
+         logger.error(f"AttributeError during client.aio.models.generate_content_stream call: {ae}. Verify method existence and parameters.", exc_info=True)
          raise RuntimeError(f"Gemini API async call failed: {ae}")
     except Exception as e:
         logger.error(f"Error during Gemini API call for emotion breakdown: {e}", exc_info=True)
         return None
 
 
-async def generate_single_reflection_async(prompt: str, emotions: int) -> Optional[str]:
+def _merge_emotion_windows(window_results: List[Tuple[int, Dict[str, float]]]) -> Dict[str, float]:
+    """
+    Merges per-window breakdowns by averaging percentages weighted by entry count.
+
+    Names are matched case- and whitespace-insensitively ("Joy", "joy " and "JOY" are one
+    emotion), shown in the first spelling seen. An emotion absent from a window counts as
+    0% there. Only the top _MAX_EMOTIONS emotions of the merged result are kept.
+
+    Args:
+        window_results: (entry_count, emotions_dict) pairs for the successful windows.
+
+    Returns:
+        The merged dictionary mapping emotion names to percentages.
+    """
+    total = sum(count for count, _ in window_results)
+    merged: Dict[str, float] = {}
+    display_names: Dict[str, str] = {}
+    for count, emotions in window_results:
+        for name, percentage in emotions.items():
+            display = name.strip()
+            key = display.casefold()
+            display_names.setdefault(key, display)
+            merged[key] = merged.get(key, 0.0) + percentage * count
+    top = sorted(merged.items(), key=lambda item: item[1], reverse=True)[:_MAX_EMOTIONS]
+    return {display_names[key]: round(weighted / total, 1) for key, weighted in top}
+
+
+def prepare_emotion_prompts(journal_prompts: List[str]) -> List[str]:
+    """
+    Builds the prompt list sent for an emotion breakdown (the single place input caps apply).
+
+    Each entry is cut to settings.max_chars_per_prompt, then identical entries are sent once
+    with an " (xN)" suffix (saves tokens, keeps their weight), then the settings.max_prompts
+    most recent unique entries are kept. Truncating first keeps the suffix intact.
+
+    Args:
+        journal_prompts: Journal entry texts, newest first; empty entries are dropped.
+
+    Returns:
+        The prompts to pass to generate_emotion_breakdown_async, newest first.
+    """
+    counts = Counter(p[:settings.max_chars_per_prompt] for p in journal_prompts if p)
+    return [f"{p} (x{c})" if c > 1 else p for p, c in counts.items()][:settings.max_prompts]
+
+
+def emotion_cache_key(journal_prompts: List[str]) -> str:
+    """
+    Returns the cache key of a prepared prompt list (from prepare_emotion_prompts).
+
+    The key covers exactly what Gemini is sent, in order, so every cache layer
+    (in-process here, MongoDB in dashboard_service) can share it.
+    """
+    # Hash entry by entry rather than joining the full prompt set just for the key
+    hasher = hashlib.sha256()
+    for prompt in journal_prompts:
+        hasher.update(prompt.encode("utf-8"))
+        hasher.update(b"\0") # Entry boundary, so ["ab"] and ["a", "b"] differ
+    return hasher.hexdigest()
+
+
+def get_cached_emotion_breakdown(cache_key: str) -> Optional[Dict[str, float]]:
+    """
+    Looks up a previous emotion breakdown in the in-process cache.
+
+    Lets callers skip slower cache layers (e.g. MongoDB) on a hit, without calling Gemini.
+
+    Args:
+        cache_key: emotion_cache_key() of the prepared prompts.
+
+    Returns:
+        A copy of the cached breakdown, or None if it isn't cached.
+    """
+    cached: Optional[Dict[str, float]] = _emotion_response_cache.get(cache_key)
+    if cached is None:
+        return None
+    logger.debug(f"Emotion breakdown response cache hit (key {cache_key[:12]}).")
+    return dict(cached) # Copy so callers can't mutate the cached entry
+
+
+async def generate_emotion_breakdown_async(
+    journal_prompts: List[str],
+    service_tier: ServiceTier = "standard",
+    cache_key: Optional[str] = None,
+) -> Optional[Dict[str, float]]:
+    """
+    Analyzes prompts with Gemini (V1 style - async, JSON structured output) to
+    generate an emotional breakdown.
+
+    Prompts are split into windows of settings.emotion_window_size entries that are
+    analyzed concurrently (at most settings.emotion_window_concurrency in flight) and
+    merged by entry-weighted average, keeping each Gemini call's input small.
+
+    Args:
+        journal_prompts: Prompts built by prepare_emotion_prompts (sent as-is, newest first).
+        service_tier: One of SERVICE_TIERS (default: "standard").
+        cache_key: emotion_cache_key(journal_prompts), if the caller already computed it.
+
+    Returns:
+        A dictionary mapping emotion names to percentages, or None on failure.
+
+    Raises:
+        RuntimeError: If the 'client' object is None or lacks the 'aio' attribute.
+    """
+    if not _CLIENT_READY:
+        logger.error("Gemini client (genai.Client) or its 'aio' attribute is not available for emotion breakdown.")
+        raise RuntimeError("Gemini client or its async interface failed to initialize.")
+
+    if not journal_prompts:
+        logger.warning("generate_emotion_breakdown_async called with no prompts.")
+        return None
+
+    if cache_key is None:
+        cache_key = emotion_cache_key(journal_prompts)
+    cached: Optional[Dict[str, float]] = _emotion_response_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f"Emotion breakdown response cache hit (key {cache_key[:12]}).")
+        return dict(cached) # Copy so callers can't mutate the cached entry
+
+    size = settings.emotion_window_size
+    windows = [journal_prompts[i:i + size] for i in range(0, len(journal_prompts), size)]
+
+    if len(windows) == 1:
+        emotions_dict = await _emotion_breakdown_window(windows[0], service_tier)
+    else:
+        semaphore = asyncio.Semaphore(settings.emotion_window_concurrency)
+
+        async def _bounded(window: List[str]) -> Optional[Dict[str, float]]:
+            async with semaphore:
+                return await _emotion_breakdown_window(window, service_tier)
+
+        logger.info(f"Splitting {len(journal_prompts)} prompts into {len(windows)} emotion breakdown windows.")
+        results = await asyncio.gather(*(_bounded(w) for w in windows), return_exceptions=True)
+        successful = []
+        for window, result in zip(windows, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Emotion breakdown window failed: {result}")
+            elif result:
+                successful.append((len(window), result))
+        emotions_dict = _merge_emotion_windows(successful) if successful else None
+
+    if emotions_dict and _MIN_EMOTIONS <= len(emotions_dict) <= _MAX_EMOTIONS:
+        _emotion_response_cache[cache_key] = dict(emotions_dict)
+    return emotions_dict
+
+
+async def generate_single_reflection_async(prompt: str, emotions: int, service_tier: ServiceTier = "standard") -> Optional[str]:
     """
     Generates a single reflection using client.aio.models.generate_content (V1 style - async).
 
     Args:
         prompt: The user's journal text.
         emotions: The user's emotion score.
+        service_tier: One of SERVICE_TIERS (default: "standard").
 
     Returns:
         The generated reflection text as a string, or None if generation fails.
@@ -153,7 +573,7 @@ async def generate_single_reflection_async(prompt: str, emotions: int) -> Option
     Raises:
         RuntimeError: If the 'client' object is None or lacks the 'aio' attribute.
     """
-    if client is None or not hasattr(client, 'aio'):
+    if not _CLIENT_READY:
         logger.error("Gemini client (genai.Client) or its 'aio' attribute is not available for single reflection.")
         raise RuntimeError("Gemini client or its async interface failed to initialize.")
 
@@ -162,24 +582,18 @@ async def generate_single_reflection_async(prompt: str, emotions: int) -> Option
 
     try:
         # --- Correct V1 Style Async Call using client.aio ---
-        # Pass system prompt via GenerateContentConfig, like V1
-        config = types.GenerateContentConfig(
-             # Add generation parameters if needed
-             system_instruction=SYSTEM_PROMPT_REFLECTION # Pass system prompt via config
-        )
-
-        # Use client.aio for the async version
+        # Use client.aio for the async version; system prompt via shared config, like V1
         response = await client.aio.models.generate_content(
             model=GEMINI_MODEL_NAME,
             contents=content_for_gemini,
-            generation_config=config
+            config=_REFLECTION_CONFIGS[service_tier]
         )
         # --- End Call ---
 
         # --- Response Handling (remains the same) ---
         if response and hasattr(response, 'text') and response.text:
             logger.info("Successfully generated single reflection.")
-            reflection_text = response.text.strip().strip('"')
+            reflection_text = response.text.strip(_REFLECTION_STRIP_CHARS)
             return reflection_text
         else:
             logger.error("Received empty or invalid response from Gemini for single reflection.")
@@ -193,9 +607,197 @@ async def generate_single_reflection_async(prompt: str, emotions: int) -> Option
         logger.error(f"Error during Gemini API call for single reflection: {e}", exc_info=True)
         return None
 
+async def generate_reflections_bulk_async(
+    items: List[Tuple[str, int]],
+    concurrency: Optional[int] = None,
+    service_tier: Optional[ServiceTier] = None
+) -> List[Optional[str]]:
+    """
+    Generates reflections for many (prompt, emotions) pairs concurrently.
+
+    Calls are issued via asyncio.gather, capped by a semaphore so bursts stay
+    within the Gemini quota.
+
+    Args:
+        items: A list of (prompt, emotions) pairs.
+        concurrency: Max in-flight Gemini calls (default: settings.gemini_max_concurrency).
+        service_tier: One of SERVICE_TIERS (default: settings.gemini_batch_service_tier).
+
+    Returns:
+        A list of reflection texts aligned with `items`; entries are None where generation failed.
+    """
+    if not items:
+        return []
+
+    semaphore = asyncio.Semaphore(concurrency or settings.gemini_max_concurrency)
+    tier = service_tier or settings.gemini_batch_service_tier # Bulk work is latency-tolerant
+
+    async def _bounded(prompt: str, emotions: int) -> Optional[str]:
+        async with semaphore:
+            return await generate_single_reflection_async(prompt, emotions, service_tier=tier)
+
+    logger.info(f"Requesting {len(items)} reflections concurrently (max in flight: {concurrency or settings.gemini_max_concurrency})...")
+    results = await asyncio.gather(*(_bounded(p, e) for p, e in items), return_exceptions=True)
+
+    reflections: List[Optional[str]] = []
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.error(f"Bulk reflection {index} failed: {result}")
+            reflections.append(None)
+        else:
+            reflections.append(result)
+    return reflections
+
+
+async def stream_single_reflection_async(prompt: str, emotions: int, service_tier: ServiceTier = "standard") -> AsyncIterator[str]:
+    """
+    Streams a single reflection using client.aio.models.generate_content_stream,
+    yielding text chunks as Gemini produces them.
+
+    Args:
+        prompt: The user's journal text.
+        emotions: The user's emotion score.
+        service_tier: One of SERVICE_TIERS (default: "standard").
+
+    Yields:
+        Non-empty text chunks of the reflection.
+
+    Raises:
+        RuntimeError: If the 'client' object is None or lacks the 'aio' attribute,
+                      or if the streaming call fails.
+    """
+    if not _CLIENT_READY:
+        logger.error("Gemini client (genai.Client) or its 'aio' attribute is not available for streamed reflection.")
+        raise RuntimeError("Gemini client or its async interface failed to initialize.")
+
+    logger.info(f"Requesting streamed reflection via client.aio.models.generate_content_stream for prompt (len: {len(prompt)}), emotions: {emotions}")
+    content_for_gemini = [prompt, f"emotions,{emotions}"]
+
+    try:
+        stream = await client.aio.models.generate_content_stream(
+            model=GEMINI_MODEL_NAME,
+            contents=content_for_gemini,
+            config=_REFLECTION_CONFIGS[service_tier] # System prompt via shared config
+        )
+        async for chunk in stream:
+            if chunk and chunk.text:
+                yield chunk.text
+        logger.info("Successfully streamed single reflection.")
+    except Exception as e:
+        logger.error(f"Error during Gemini streaming call for single reflection: {e}", exc_info=True)
+        raise RuntimeError(f"Gemini API streaming call failed: {e}")
+
+# --- Batch API (non-interactive weekly reflections) ---
+# Batch jobs run asynchronously on Google's side at a discount; nothing here is on a request path.
+# The Developer API reports BATCH_STATE_* names; the SDK maps most to JOB_STATE_* but not all, so accept both
+BATCH_SUCCEEDED_STATES = {"JOB_STATE_SUCCEEDED", "BATCH_STATE_SUCCEEDED"}
+BATCH_TERMINAL_STATES = BATCH_SUCCEEDED_STATES | {
+    "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED",
+    "BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED",
+}
+
+async def submit_weekly_reflection_batch(entries: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Submits a Gemini Batch API job generating one weekly reflection per user.
+
+    Args:
+        entries: A list of {"uid": str, "prompts": List[str]} dicts (a user's journals for the week).
+
+    Returns:
+        The batch job name (used to poll for results), or None if there was nothing to submit or submission failed.
+
+    Raises:
+        RuntimeError: If the 'client' object is None or lacks the 'aio' attribute.
+    """
+    if not _CLIENT_READY:
+        logger.error("Gemini client (genai.Client) or its 'aio' attribute is not available for batch submission.")
+        raise RuntimeError("Gemini client or its async interface failed to initialize.")
+
+    if not entries:
+        logger.warning("submit_weekly_reflection_batch called with no entries.")
+        return None
+
+    # One JSONL line per user, keyed by UID so results can be matched back
+    lines = []
+    for entry in entries:
+        week_text = "\n---\n".join(entry["prompts"])
+        lines.append(orjson.dumps({
+            "key": entry["uid"],
+            "request": {
+                "contents": [{"role": "user", "parts": [{"text": f"Reflect on this week's journal entries:\n\n{week_text}"}]}],
+                "system_instruction": {"parts": [{"text": SYSTEM_PROMPT_REFLECTION}]}
+            }
+        }))
+    payload = b"\n".join(lines) # orjson emits UTF-8 bytes directly
+
+    try:
+        uploaded = await client.aio.files.upload(
+            file=io.BytesIO(payload),
+            config=types.UploadFileConfig(display_name="weekly-reflections", mime_type="jsonl")
+        )
+        batch_job = await client.aio.batches.create(
+            model=GEMINI_MODEL_NAME,
+            src=uploaded.name,
+            config=types.CreateBatchJobConfig(display_name="weekly-reflections")
+        )
+        logger.info(f"Submitted weekly reflection batch '{batch_job.name}' for {len(entries)} users.")
+        return batch_job.name
+    except Exception as e:
+        logger.error(f"Error submitting weekly reflection batch: {e}", exc_info=True)
+        return None
+
+
+async def get_weekly_reflection_batch_results(batch_name: str) -> Optional[Dict[str, str]]:
+    """
+    Checks a weekly reflection batch job and returns its results once finished.
+
+    Args:
+        batch_name: The name returned by submit_weekly_reflection_batch.
+
+    Returns:
+        None while the job is still running (or the status check itself failed); otherwise a dict mapping UID to reflection text
+        (empty if the job failed or produced no usable output).
+
+    Raises:
+        RuntimeError: If the 'client' object is None or lacks the 'aio' attribute.
+    """
+    if not _CLIENT_READY:
+        logger.error("Gemini client (genai.Client) or its 'aio' attribute is not available for batch polling.")
+        raise RuntimeError("Gemini client or its async interface failed to initialize.")
+
+    try:
+        batch_job = await client.aio.batches.get(name=batch_name)
+    except Exception as e:
+        # Transient polling failures shouldn't abort the job; report "still running" and let the caller retry
+        logger.warning(f"Error polling weekly reflection batch '{batch_name}': {e}")
+        return None
+    state = getattr(batch_job.state, "name", str(batch_job.state))
+    if state not in BATCH_TERMINAL_STATES:
+        logger.debug(f"Weekly reflection batch '{batch_name}' still running (state: {state}).")
+        return None
+    if state not in BATCH_SUCCEEDED_STATES:
+        logger.error(f"Weekly reflection batch '{batch_name}' finished with state {state}.")
+        return {}
+
+    results: Dict[str, str] = {}
+    raw = await client.aio.files.download(file=batch_job.dest.file_name)
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = orjson.loads(line)
+            text = item["response"]["candidates"][0]["content"]["parts"][0]["text"]
+            if text:
+                results[item["key"]] = text.strip(_REFLECTION_STRIP_CHARS)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping unparseable batch result line in '{batch_name}': {e}")
+    logger.info(f"Weekly reflection batch '{batch_name}' produced {len(results)} reflections.")
+    return results
+# --- End Batch API ---
+
 # --- Placeholder for other functions (e.g., YSYM) using client.aio pattern ---
 # async def generate_full_reflection_with_ysym_async(prompt: str, emotions: int) -> Dict:
-#    if client is None or not hasattr(client, 'aio'): raise RuntimeError("Gemini client error.")
+#    if not _CLIENT_READY: raise RuntimeError("Gemini client error.")
 #    # Replicate V1's two calls using await client.aio.models.generate_content(...)
 #    pass
 # --- End Placeholder ---
\ No newline at end of file
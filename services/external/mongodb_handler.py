@@ -1,16 +1,22 @@
 # services/external/mongodb_handler.py
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import WriteConcern
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from core.db import get_db # Import the async function to get db instance
+from core.config import get_settings
 from models.user import UserCreate, UserInDB # Import relevant user models
 # Ensure models for journal/reflection are imported if needed by future functions
 # from models.journal import JournalInDB
 # from models.dashboard import WeeklyReflectionInDB
 
 from typing import Optional, List, Dict # Import necessary types
+from cachetools import TTLCache
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone # Import datetime components
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # --- Define Collection Names (Matching V1) ---
 USERDATA_COLLECTION = "userdata"
@@ -18,23 +24,68 @@ JOURNALS_COLLECTION = "journals"
 REFLECTIONS_COLLECTION = "reflections" # Define even if not used yet
 WEEKLY_REFLECTIONS_COLLECTION = "weekly_reflections"
 WISPERS_COLLECTION = "wispers" # Define even if not used yet
+EMOTION_BREAKDOWN_CACHE_COLLECTION = "emotion_breakdown_cache" # Gemini results keyed by prompt-set hash
+EMOTION_BREAKDOWN_CACHE_TTL_SECONDS = 24 * 60 * 60
+# Backs the per-user date-window journal queries; the B-tree is walked in either sort direction
+JOURNALS_USER_DATE_INDEX = [("UID", 1), ("created_at", 1)]
+WEEKLY_REFLECTIONS_LATEST_INDEX = [("UID", 1), ("created_at", -1)] # Backs the latest-reflection lookup
 # --- End Collection Names ---
 
+
+class UserAlreadyExists(Exception):
+    """Raised by create_new_user when a user with the UID already exists."""
+
 # --- Helper functions to get specific collections ---
+# Collection references bound once at startup by bind_collections(), so the query
+# functions below use them directly instead of awaiting get_db() on every call.
+_userdata_coll: Optional[AsyncIOMotorCollection] = None
+_userdata_write_coll: Optional[AsyncIOMotorCollection] = None
+_journals_coll: Optional[AsyncIOMotorCollection] = None
+_weekly_ref_coll: Optional[AsyncIOMotorCollection] = None
+_emotion_cache_coll: Optional[AsyncIOMotorCollection] = None
+
+async def bind_collections() -> None:
+    """Resolves and stores the collection references (call once after connect_db)."""
+    global _userdata_coll, _userdata_write_coll, _journals_coll, _weekly_ref_coll, _emotion_cache_coll
+    db: AsyncIOMotorDatabase = await get_db()
+    _userdata_coll = db[USERDATA_COLLECTION]
+    # Relaxed write concern (w=1, j=False): writes are acknowledged once the primary applies
+    # them, without waiting for replication or the journal flush. Use only for retry-safe writes.
+    _userdata_write_coll = db.get_collection(USERDATA_COLLECTION, write_concern=WriteConcern(w=1, j=False))
+    _journals_coll = db[JOURNALS_COLLECTION]
+    _weekly_ref_coll = db[WEEKLY_REFLECTIONS_COLLECTION]
+    _emotion_cache_coll = db[EMOTION_BREAKDOWN_CACHE_COLLECTION]
+
+# Thin async wrappers (bind on first use if startup didn't)
 async def get_userdata_collection() -> AsyncIOMotorCollection:
     """Helper function to get the userdata collection instance."""
-    db: AsyncIOMotorDatabase = await get_db()
-    return db[USERDATA_COLLECTION]
+    if _userdata_coll is None:
+        await bind_collections()
+    return _userdata_coll
+
+async def get_userdata_write_collection() -> AsyncIOMotorCollection:
+    """Helper function to get the userdata collection with the relaxed (w=1, j=False) write concern."""
+    if _userdata_write_coll is None:
+        await bind_collections()
+    return _userdata_write_coll
 
 async def get_journals_collection() -> AsyncIOMotorCollection:
     """Helper function to get the journals collection instance."""
-    db: AsyncIOMotorDatabase = await get_db()
-    return db[JOURNALS_COLLECTION]
+    if _journals_coll is None:
+        await bind_collections()
+    return _journals_coll
 
 async def get_weekly_reflections_collection() -> AsyncIOMotorCollection:
     """Helper function to get the weekly_reflections collection instance."""
-    db: AsyncIOMotorDatabase = await get_db()
-    return db[WEEKLY_REFLECTIONS_COLLECTION]
+    if _weekly_ref_coll is None:
+        await bind_collections()
+    return _weekly_ref_coll
+
+async def get_emotion_breakdown_cache_collection() -> AsyncIOMotorCollection:
+    """Helper function to get the emotion_breakdown_cache collection instance."""
+    if _emotion_cache_coll is None:
+        await bind_collections()
+    return _emotion_cache_coll
 
 # Add more helpers for other collections (reflections, wispers) if needed
 # async def get_reflections_collection() -> AsyncIOMotorCollection: ...
@@ -43,6 +94,85 @@ async def get_weekly_reflections_collection() -> AsyncIOMotorCollection:
 # --- End Helper functions ---
 
 
+# --- Index Management / Warm-up ---
+# True once the unique UID index is confirmed; until then create_new_user checks for duplicates itself
+_uid_unique_index_ready: bool = False
+
+async def ensure_indexes() -> None:
+    """
+    Creates the indexes backing the hot query paths (idempotent; call at startup).
+
+    - userdata (UID, unique): enforces one user per UID so registration is a single insert.
+    - journals (UID, created_at): date-window queries for /past_entries and
+      the emotion breakdown, served as an index range scan instead of a COLLSCAN.
+    - weekly_reflections (UID, created_at desc): latest-reflection lookup as a
+      single index seek (hinted by get_latest_weekly_reflection_for_user).
+    - emotion_breakdown_cache (created_at, TTL): expires cached Gemini results after 24h.
+    """
+    global _uid_unique_index_ready
+    user_collection = await get_userdata_collection()
+    try:
+        await user_collection.create_index("UID", unique=True)
+        _uid_unique_index_ready = True
+        logger.info(f"Ensured unique index on '{USERDATA_COLLECTION}'.")
+    except Exception as e:
+        # Fails if duplicate UIDs already exist; registration falls back to read-before-insert
+        logger.error(f"Error creating unique index on '{USERDATA_COLLECTION}' (falling back to read-before-insert duplicate checks): {e}", exc_info=True)
+
+    journals_collection = await get_journals_collection()
+    try:
+        await journals_collection.create_index(JOURNALS_USER_DATE_INDEX)
+        logger.info(f"Ensured indexes on '{JOURNALS_COLLECTION}'.")
+    except Exception as e:
+        # Don't block startup; queries still work (just slower) without the index
+        logger.error(f"Error creating indexes on '{JOURNALS_COLLECTION}': {e}", exc_info=True)
+
+    weekly_ref_collection = await get_weekly_reflections_collection()
+    try:
+        await weekly_ref_collection.create_index(WEEKLY_REFLECTIONS_LATEST_INDEX)
+        logger.info(f"Ensured indexes on '{WEEKLY_REFLECTIONS_COLLECTION}'.")
+    except Exception as e:
+        logger.error(f"Error creating indexes on '{WEEKLY_REFLECTIONS_COLLECTION}': {e}", exc_info=True)
+
+    cache_collection = await get_emotion_breakdown_cache_collection()
+    try:
+        await cache_collection.create_index("created_at", expireAfterSeconds=EMOTION_BREAKDOWN_CACHE_TTL_SECONDS)
+        logger.info(f"Ensured TTL index on '{EMOTION_BREAKDOWN_CACHE_COLLECTION}'.")
+    except Exception as e:
+        logger.error(f"Error creating TTL index on '{EMOTION_BREAKDOWN_CACHE_COLLECTION}': {e}", exc_info=True)
+
+
+async def warm_up() -> None:
+    """
+    Issues a no-op lookup per hot collection at startup so collection metadata and
+    pooled connections are ready before the first request. Failures are logged and ignored.
+    """
+    try:
+        collections = await asyncio.gather(
+            get_userdata_collection(),
+            get_journals_collection(),
+            get_weekly_reflections_collection()
+        )
+        await asyncio.gather(*(coll.find_one({"_id": "__warm__"}) for coll in collections))
+        logger.info("MongoDB collections warmed up.")
+    except Exception as e:
+        logger.warning(f"MongoDB warm-up failed: {e}")
+# --- End Index Management / Warm-up ---
+
+
+# --- User Lookup Cache (opt-in via settings.user_cache_enabled) ---
+# User docs change rarely, so a short per-process TTL turns repeat lookups into a dict hit.
+# Only found users are cached; call invalidate_user() after any write to a user document.
+_user_cache: TTLCache = TTLCache(maxsize=settings.user_cache_maxsize, ttl=settings.user_cache_ttl_s)
+
+def invalidate_user(uid: str) -> None:
+    """Drops the cached user for a UID (call after updating the user's document)."""
+    _user_cache.pop(uid, None)
+# --- End User Lookup Cache ---
+
+# Fields UserInDB requires (the others have defaults), computed once from the model
+_USER_REQUIRED_KEYS = tuple(name for name, field in UserInDB.model_fields.items() if field.is_required())
+
 async def get_user_by_uid(uid: str) -> Optional[UserInDB]:
     """
     Finds a user in the 'userdata' collection by their UID.
@@ -53,16 +183,25 @@ async def get_user_by_uid(uid: str) -> Optional[UserInDB]:
     Returns:
         A UserInDB model instance if found, otherwise None.
     """
-    user_collection = await get_userdata_collection()
+    if settings.user_cache_enabled:
+        cached: Optional[UserInDB] = _user_cache.get(uid)
+        if cached is not None:
+            return cached
+
+    user_collection = _userdata_coll
     logger.debug(f"Querying collection '{USERDATA_COLLECTION}' for UID: {uid}")
     user_doc = await user_collection.find_one({"UID": uid})
     if user_doc:
-        try:
-            # Map DB doc to Pydantic model
-            return UserInDB(**user_doc)
-        except Exception as e:
-             logger.error(f"Error parsing user document from '{USERDATA_COLLECTION}' for UID {uid}: {e}", exc_info=True)
-             return None
+        # model_construct skips validation (our own collection is trusted) but would accept a
+        # document missing required fields, so check those explicitly
+        missing = [key for key in _USER_REQUIRED_KEYS if key not in user_doc]
+        if missing:
+            logger.error(f"User document in '{USERDATA_COLLECTION}' for UID {uid} is missing required fields: {missing}")
+            return None
+        user = UserInDB.model_construct(**user_doc)
+        if settings.user_cache_enabled:
+            _user_cache[uid] = user
+        return user
     logger.debug(f"User not found in '{USERDATA_COLLECTION}' for UID: {uid}")
     return None
 
@@ -75,59 +214,67 @@ async def create_new_user(user_data: UserCreate) -> UserInDB:
 
     Returns:
         The newly created user data as a UserInDB model instance.
-        Raises ValueError if insertion fails.
+
+    Raises:
+        UserAlreadyExists: If a user with the same UID already exists (unique index, or a
+            lookup first if ensure_indexes couldn't confirm that index).
+        ValueError: If insertion fails for any other reason.
     """
-    user_collection = await get_userdata_collection()
+    # User init is retry-safe (the client re-POSTs on failure), so skip the majority/journal wait
+    user_collection = _userdata_write_coll
     logger.info(f"Attempting to insert new user into '{USERDATA_COLLECTION}' with UID: {user_data.UID}")
 
+    if not _uid_unique_index_ready:
+        # Without the unique index an insert would silently duplicate the UID (racy, but better than nothing)
+        if await _userdata_coll.find_one({"UID": user_data.UID}, {"_id": 1}) is not None:
+            raise UserAlreadyExists(user_data.UID)
+
     # Prepare document based on UserInDB model (which includes defaults)
-    new_user_doc = UserInDB(
+    new_user = UserInDB(
         UID=user_data.UID,
         Uname=user_data.Uname,
         Ustreak=0,
         UL_streak=0
         # Add other default fields like creation timestamp if needed in UserInDB model
         # e.g., account_created_at=datetime.now(timezone.utc)
-    ).model_dump(by_alias=True, exclude_unset=True) # Use model_dump for Pydantic v2
+    )
+    new_user_doc = new_user.model_dump(by_alias=True, exclude_unset=True) # Use model_dump for Pydantic v2
 
     try:
         result = await user_collection.insert_one(new_user_doc)
         if result.inserted_id:
-            # Retrieve to confirm and return consistent data
-            created_user = await get_user_by_uid(user_data.UID)
-            if created_user:
-                 logger.info(f"Successfully inserted and retrieved user from '{USERDATA_COLLECTION}' with UID: {user_data.UID}")
-                 return created_user
-            else:
-                 # This case should ideally not happen if insert_one succeeded without error
-                 # and get_user_by_uid works correctly. Log and raise.
-                 logger.error(f"Failed to retrieve user from '{USERDATA_COLLECTION}' immediately after creation for UID {user_data.UID}")
-                 raise ValueError("User creation failed: Could not retrieve after insert.")
+            # The inserted document is fully known locally, so no confirmation read is needed
+            logger.info(f"Successfully inserted user into '{USERDATA_COLLECTION}' with UID: {user_data.UID}")
+            if settings.user_cache_enabled:
+                _user_cache[new_user.UID] = new_user # Fresh copy; replaces any stale entry
+            return new_user
         else:
             logger.error(f"MongoDB insert_one did not return an inserted_id into '{USERDATA_COLLECTION}' for UID {user_data.UID}")
             raise ValueError("User creation failed: No document inserted.")
+    except DuplicateKeyError:
+        logger.warning(f"User with UID {user_data.UID} already exists in '{USERDATA_COLLECTION}'.")
+        raise UserAlreadyExists(user_data.UID)
     except Exception as e:
-        # Log the detailed exception, including potential DuplicateKeyError
+        # Log the detailed exception and re-raise a more generic one
         logger.error(f"Database error during user creation in '{USERDATA_COLLECTION}' for UID {user_data.UID}: {e}", exc_info=True)
-        # Re-raise a more generic or specific exception
-        # Consider catching pymongo.errors.DuplicateKeyError specifically if needed
         raise ValueError(f"Database error during user creation: {e}")
 
 
-async def get_journals_for_user_past_days(uid: str, days: int = 7) -> List[Dict]:
+async def get_journals_for_user_past_days(uid: str, days: int = 7, max_entries: int = 200) -> List[str]:
     """
-    Retrieves journal entries for a specific user from the past N days.
+    Retrieves journal prompts for a specific user from the past N days, newest first.
     Assumes journals collection documents contain 'UID' and 'created_at' fields.
 
     Args:
         uid: The User Identifier.
         days: The number of past days to retrieve journals for (default: 7).
+        max_entries: Upper bound on entries fetched, applied server-side (default: 200).
 
     Returns:
-        A list of journal documents (as dicts), containing at least 'prompt'.
+        A list of non-empty prompt strings.
         Returns an empty list if no journals are found or on error.
     """
-    journals_collection = await get_journals_collection()
+    journals_collection = _journals_coll
     # Calculate the start date (N days ago from today)
     # Using timezone.utc for consistency, adjust if your DB stores naive datetimes
     end_date = datetime.now(timezone.utc)
@@ -143,35 +290,143 @@ async def get_journals_for_user_past_days(uid: str, days: int = 7) -> List[Dict]
                 "created_at": {"$gte": start_date, "$lt": end_date},
                 "prompt": {"$exists": True, "$ne": ""} # Ensure prompt exists and is not empty
             },
-            # Project only fields needed for emotion analysis + maybe created_at for context
-            {"prompt": 1, "created_at": 1, "_id": 0}
-        ).sort("created_at", -1) # Sort descending or ascending as needed
-
-        # Use length=None to retrieve all matching documents
-        journals = await cursor.to_list(length=None)
-        logger.info(f"Found {len(journals)} journals in '{JOURNALS_COLLECTION}' for UID '{uid}' in the past {days} days.")
-        return journals if journals else []
+            # Project only the field the emotion analysis uses (sorting still happens server-side)
+            {"prompt": 1, "_id": 0}
+        ).sort("created_at", -1).limit(max_entries).batch_size(100)
+        # The sort stays: callers keep the newest entries when truncating, and the (UID, created_at)
+        # index is walked backwards, so there is no in-memory sort stage. batch_size streams replies.
+
+        # Keep only the prompt strings as batches arrive, instead of holding the documents
+        prompts = [doc["prompt"] async for doc in cursor]
+        logger.info(f"Found {len(prompts)} journals in '{JOURNALS_COLLECTION}' for UID '{uid}' in the past {days} days.")
+        return prompts
     except Exception as e:
         logger.error(f"Error retrieving journals from '{JOURNALS_COLLECTION}' for UID '{uid}': {e}", exc_info=True)
         return [] # Return empty list on error
 
 
+async def get_recent_prompts_by_user(days: int = 7) -> List[Dict]:
+    """
+    Retrieves journal prompts from the past N days, grouped per user.
+    Used by the weekly reflection batch job.
+
+    Args:
+        days: The number of past days to include (default: 7).
+
+    Returns:
+        A list of {"uid": str, "prompts": List[str]} dicts, or an empty list on error.
+    """
+    journals_collection = _journals_coll
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=days)
+    logger.debug(f"Grouping prompts in '{JOURNALS_COLLECTION}' per user from {start_date} to {end_date}")
+    try:
+        pipeline = [
+            {
+                "$match": {
+                    "created_at": {"$gte": start_date, "$lt": end_date},
+                    "prompt": {"$exists": True, "$ne": ""}
+                }
+            },
+            {"$sort": {"created_at": 1}}, # Keep each user's prompts in chronological order
+            {"$group": {"_id": "$UID", "prompts": {"$push": "$prompt"}}},
+            {"$project": {"_id": 0, "uid": "$_id", "prompts": 1}}
+        ]
+        results = await journals_collection.aggregate(pipeline).to_list(length=None)
+        logger.info(f"Found recent prompts for {len(results)} users in the past {days} days.")
+        return results
+    except Exception as e:
+        logger.error(f"Error grouping recent prompts from '{JOURNALS_COLLECTION}': {e}", exc_info=True)
+        return []
+
+
+async def insert_weekly_reflections(reflections: Dict[str, str]) -> int:
+    """
+    Bulk-inserts generated weekly reflections into the 'weekly_reflections' collection.
+
+    Args:
+        reflections: A dict mapping UID to reflection text.
+
+    Returns:
+        The number of documents inserted (0 on error or empty input).
+    """
+    if not reflections:
+        return 0
+    weekly_ref_collection = _weekly_ref_coll
+    created_at = datetime.now(timezone.utc)
+    docs = [
+        {"UID": uid, "weekly_reflection": text, "created_at": created_at}
+        for uid, text in reflections.items()
+    ]
+    try:
+        result = await weekly_ref_collection.insert_many(docs, ordered=False)
+        logger.info(f"Inserted {len(result.inserted_ids)} weekly reflections into '{WEEKLY_REFLECTIONS_COLLECTION}'.")
+        return len(result.inserted_ids)
+    except Exception as e:
+        logger.error(f"Error inserting weekly reflections into '{WEEKLY_REFLECTIONS_COLLECTION}': {e}", exc_info=True)
+        return 0
+
+
+async def get_cached_emotion_breakdown(cache_key: str) -> Optional[Dict[str, float]]:
+    """
+    Looks up a cached emotion breakdown by prompt-set hash.
+
+    Args:
+        cache_key: gemini_handler.emotion_cache_key() of the prompts the breakdown was computed from.
+
+    Returns:
+        The cached emotion-to-percentage dict, or None if not cached or on error.
+    """
+    cache_collection = _emotion_cache_coll
+    try:
+        cached_doc = await cache_collection.find_one({"_id": cache_key}, {"emotions": 1, "_id": 0})
+        return cached_doc["emotions"] if cached_doc else None
+    except Exception as e:
+        logger.error(f"Error reading '{EMOTION_BREAKDOWN_CACHE_COLLECTION}' for key {cache_key}: {e}", exc_info=True)
+        return None
+
+
+async def store_emotion_breakdown(cache_key: str, uid: str, emotions: Dict[str, float]) -> None:
+    """
+    Caches an emotion breakdown under its prompt-set hash (expires via TTL index).
+    Errors are logged and ignored; caching is best-effort.
+
+    Args:
+        cache_key: gemini_handler.emotion_cache_key() of the prompts the breakdown was computed from.
+        uid: The User Identifier (stored for debugging/cleanup).
+        emotions: The emotion-to-percentage dict returned by Gemini.
+    """
+    cache_collection = _emotion_cache_coll
+    try:
+        # Upsert so concurrent misses for the same key don't raise DuplicateKeyError
+        await cache_collection.replace_one(
+            {"_id": cache_key},
+            {"uid": uid, "emotions": emotions, "created_at": datetime.now(timezone.utc)},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error writing '{EMOTION_BREAKDOWN_CACHE_COLLECTION}' for UID {uid}: {e}", exc_info=True)
+
+
 # --- Placeholder for future functions for other endpoints ---
 
 # Placeholder for getting latest weekly reflection (used by dashboard service)
 async def get_latest_weekly_reflection_for_user(uid: str) -> Optional[Dict]:
     """
     Retrieves the most recent weekly reflection document for a user.
-    Returns the full document as a dict, or None if not found or on error.
+    Returns a dict containing only 'weekly_reflection', or None if not found or on error.
+    Raises OperationFailure if the server rejects the query (e.g. the hinted index is
+    missing), so a broken deployment surfaces as a 500 instead of a misleading 404.
     """
-    weekly_ref_collection = await get_weekly_reflections_collection()
+    weekly_ref_collection = _weekly_ref_coll
     logger.debug(f"Querying collection '{WEEKLY_REFLECTIONS_COLLECTION}' for latest entry for UID: {uid}")
     try:
-        # Find one document, sorted by creation date descending
-        reflection_doc = await weekly_ref_collection.find_one(
+        # Explicit plan: one seek on the (UID, created_at desc) index (pinned by hint), one document back
+        docs = await weekly_ref_collection.find(
             {"UID": uid}, # Assuming weekly reflections also have UID field
-            sort=[("created_at", -1)] # Assuming 'created_at' field exists
-        )
+            {"weekly_reflection": 1, "_id": 0} # Only the field the dashboard reads
+        ).sort("created_at", -1).hint(WEEKLY_REFLECTIONS_LATEST_INDEX).limit(1).to_list(length=1)
+        reflection_doc = docs[0] if docs else None
         if reflection_doc:
             logger.info(f"Found latest weekly reflection for UID {uid}")
             # Potentially convert _id to str if needed by caller
@@ -180,58 +435,14 @@ async def get_latest_weekly_reflection_for_user(uid: str) -> Optional[Dict]:
         else:
             logger.info(f"No weekly reflection found for UID {uid}")
             return None
+    except OperationFailure as e:
+        logger.error(f"Weekly reflection query rejected for UID {uid} (is index {WEEKLY_REFLECTIONS_LATEST_INDEX} missing?): {e}", exc_info=True)
+        raise
     except Exception as e:
         logger.error(f"Error retrieving latest weekly reflection for UID {uid}: {e}", exc_info=True)
         return None
 
 
-# Placeholder for getting journal entry dates (used by journal service)
-async def get_distinct_journal_dates_in_range(uid: str, start_date: datetime, end_date: datetime) -> List[str]:
-    """
-    Retrieves distinct dates (YYYY-MM-DD) with journal entries for a user within a date range.
-    """
-    journals_collection = await get_journals_collection()
-    logger.debug(f"Querying distinct journal dates for UID '{uid}' from {start_date} to {end_date}")
-    try:
-        pipeline = [
-            {
-                "$match": {
-                    "UID": uid,
-                    "created_at": {"$gte": start_date, "$lt": end_date}
-                }
-            },
-            {
-                # Project created_at to YYYY-MM-DD format string
-                "$project": {
-                    "dateStr": {
-                        "$dateToString": { "format": "%Y-%m-%d", "date": "$created_at", "timezone": "UTC" } # Adjust timezone if needed
-                    }
-                }
-            },
-            {
-                # Group by the date string to get distinct dates
-                "$group": {
-                    "_id": "$dateStr"
-                }
-            },
-            {
-                # Sort the distinct dates
-                "$sort": { "_id": 1 }
-            },
-            {
-                 # Project to get just the date string
-                 "$project": { "_id": 0, "date": "$_id"}
-            }
-        ]
-        # Use aggregate for distinct dates projection
-        results = await journals_collection.aggregate(pipeline).to_list(length=None)
-        dates = [result["date"] for result in results]
-        logger.info(f"Found {len(dates)} distinct journal dates for UID '{uid}' in range.")
-        return dates
-    except Exception as e:
-        logger.error(f"Error retrieving distinct journal dates for UID '{uid}': {e}", exc_info=True)
-        return []
-
 # --- End Placeholders ---
 async def get_distinct_journal_dates_in_range(uid: str, start_date: datetime, end_date: datetime) -> List[str]:
     """
@@ -246,12 +457,16 @@ async def get_distinct_journal_dates_in_range(uid: str, start_date: datetime, en
 
     Returns:
         A sorted list of distinct date strings ("YYYY-MM-DD"), or empty list on error.
+
+    Raises:
+        OperationFailure: If the server rejects the pipeline (e.g. $dateTrunc before MongoDB
+            5.0), so an unsupported server surfaces as a 500 instead of an empty calendar.
     """
-    journals_collection = await get_journals_collection()
+    journals_collection = _journals_coll
     logger.debug(f"Querying distinct journal dates in '{JOURNALS_COLLECTION}' for UID '{uid}' from {start_date} to {end_date}")
     try:
         # Ensure the pipeline matches your document structure ('UID', 'created_at')
-        # Adjust timezone in $dateToString if your created_at is stored differently
+        # Adjust timezone in $dateTrunc if your created_at is stored differently ($dateTrunc needs MongoDB 5.0+)
         pipeline = [
             {
                 # Filter by user and date range
@@ -261,38 +476,32 @@ async def get_distinct_journal_dates_in_range(uid: str, start_date: datetime, en
                 }
             },
             {
-                # Extract date part as string
-                "$project": {
-                    "dateStr": {
-                        "$dateToString": {
-                            "format": "%Y-%m-%d",
+                # Group by the day (as a native Date, cheaper than per-doc string formatting).
+                # Only created_at is referenced, so the (UID, created_at) index covers the query.
+                "$group": {
+                    "_id": {
+                        "$dateTrunc": {
                             "date": "$created_at",
+                            "unit": "day",
                             "timezone": "UTC" # Use UTC or your DB's timezone
                         }
                     }
                 }
             },
-            {
-                # Group by date string to get unique dates
-                "$group": {
-                    "_id": "$dateStr"
-                }
-            },
             {
                 # Sort the dates chronologically
                 "$sort": { "_id": 1 }
-            },
-            {
-                 # Reshape the output to just the date string
-                 "$project": { "_id": 0, "date": "$_id"}
             }
         ]
         # Execute the aggregation pipeline
         results = await journals_collection.aggregate(pipeline).to_list(length=None)
-        # Extract the date strings from the results
-        dates = [result["date"] for result in results if "date" in result]
+        # Format the distinct days once, client-side
+        dates = [result["_id"].strftime("%Y-%m-%d") for result in results]
         logger.info(f"Found {len(dates)} distinct journal dates for UID '{uid}' in range.")
         return dates
+    except OperationFailure as e:
+        logger.error(f"Distinct journal dates pipeline rejected for UID '{uid}' ($dateTrunc needs MongoDB 5.0+): {e}", exc_info=True)
+        raise
     except Exception as e:
         logger.error(f"Error retrieving distinct journal dates from '{JOURNALS_COLLECTION}' for UID '{uid}': {e}", exc_info=True)
         return [] # Return empty list on error
\ No newline at end of file
@@ -9,6 +9,10 @@ from dateutil.relativedelta import relativedelta
 
 logger = logging.getLogger(__name__)
 
+# 5-month window offsets, built once instead of per request
+_TWO_MONTHS = relativedelta(months=2)
+_THREE_MONTHS = relativedelta(months=3)
+
 async def get_past_entry_dates(uid: str, year_str: str, month_str: str) -> List[str]:
     """
     Service function to get distinct dates with journal entries within a 5-month span
@@ -48,10 +52,10 @@ async def get_past_entry_dates(uid: str, year_str: str, month_str: str) -> List[
 
     # 2. Calculate 5-Month Date Range (Requested Month +/- 2 Months)
     # Start date: First day of the month, 2 months prior to requested month
-    start_date = requested_month_start - relativedelta(months=2)
+    start_date = requested_month_start - _TWO_MONTHS
     # End date: First day of the month, 3 months after requested month (exclusive)
     # (Because range is [start, end) )
-    end_date = requested_month_start + relativedelta(months=3)
+    end_date = requested_month_start + _THREE_MONTHS
 
     logger.debug(f"Calculated date range for UID {uid}: {start_date} to {end_date}")
 
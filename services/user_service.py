@@ -50,15 +50,8 @@ async def register_user(user_create_data: UserCreate) -> UserResponse:
         UserResponse: The newly created user's data.
     """
     logger.info(f"Attempting to register user with UID: {user_create_data.UID}")
-    existing_user = await mongodb_handler.get_user_by_uid(user_create_data.UID)
-
-    if existing_user:
-        logger.warning(f"Registration failed: User already exists with UID: {user_create_data.UID}")
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"User with UID '{user_create_data.UID}' already exists.",
-        )
 
+    # Single insert; the unique UID index rejects duplicates (the handler checks first if that index is missing)
     try:
         new_user_db: UserInDB = await mongodb_handler.create_new_user(user_create_data)
         logger.info(f"Successfully registered user with UID: {new_user_db.UID}")
@@ -70,6 +63,12 @@ async def register_user(user_create_data: UserCreate) -> UserResponse:
             UL_streak=new_user_db.UL_streak
             # Map other fields if necessary
         )
+    except mongodb_handler.UserAlreadyExists:
+        logger.warning(f"Registration failed: User already exists with UID: {user_create_data.UID}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"User with UID '{user_create_data.UID}' already exists.",
+        )
     except ValueError as e: # Catch specific error from handler
         logger.error(f"Registration failed due to database error for UID {user_create_data.UID}: {e}", exc_info=True)
         raise HTTPException(
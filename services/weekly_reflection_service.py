@@ -0,0 +1,70 @@
+# services/weekly_reflection_service.py
+from services.external import mongodb_handler, gemini_handler # Import handlers
+from typing import Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 60
+MAX_WAIT_SECONDS = 48 * 3600 # Batch jobs expire on Google's side after ~48h
+
+async def run_weekly_reflection_batch(
+    days: int = 7,
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+    max_wait: float = MAX_WAIT_SECONDS,
+) -> int:
+    """
+    Background job: generates weekly reflections for all active users via the Gemini Batch API
+    and stores them, so GET /weekly_reflection only ever reads from MongoDB.
+
+    Intended to be run on a schedule (e.g., weekly cron), not from a request handler. It runs in
+    its own process, so the API's in-memory dashboard cache isn't invalidated; new reflections
+    show up there once the cached entry expires (settings.dashboard_cache_ttl_s).
+
+    Args:
+        days: The number of past days of journals to reflect on (default: 7).
+        poll_interval: Seconds between batch status checks.
+        max_wait: Seconds to keep polling before giving up on the batch.
+
+    Returns:
+        The number of weekly reflections stored.
+    """
+    entries = await mongodb_handler.get_recent_prompts_by_user(days=days)
+    if not entries:
+        logger.info("No recent journals found; skipping weekly reflection batch.")
+        return 0
+
+    batch_name: Optional[str] = await gemini_handler.submit_weekly_reflection_batch(entries)
+    if batch_name is None:
+        logger.error("Weekly reflection batch submission failed.")
+        return 0
+
+    # Batch jobs complete asynchronously (minutes to hours); poll until a terminal state or the deadline
+    deadline = time.monotonic() + max_wait
+    while (results := await gemini_handler.get_weekly_reflection_batch_results(batch_name)) is None:
+        if time.monotonic() >= deadline:
+            logger.error(f"Weekly reflection batch '{batch_name}' did not finish within {max_wait:.0f}s; giving up.")
+            return 0
+        await asyncio.sleep(poll_interval)
+
+    stored = await mongodb_handler.insert_weekly_reflections(results)
+    logger.info(f"Weekly reflection batch '{batch_name}' complete: stored {stored} reflections.")
+    return stored
+
+
+# Run manually or from a scheduler: python -m services.weekly_reflection_service
+if __name__ == "__main__":
+    from core.db import db_manager
+
+    async def _main():
+        await db_manager.connect_db()
+        await mongodb_handler.bind_collections()
+        try:
+            await run_weekly_reflection_batch()
+        finally:
+            await db_manager.close_db()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+
+# Settings are read at import time; provide the required values so modules import without a .env
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB_NAME", "echo_test")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
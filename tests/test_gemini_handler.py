@@ -0,0 +1,60 @@
+# tests/test_gemini_handler.py
+from typing import Dict, List
+
+import pytest
+
+from services.external import gemini_handler
+
+
+def _parse_chunks(chunks: List[str]) -> Dict[str, float]:
+    """Feeds chunks through _parse_emotion_text the way _stream_emotion_breakdown does."""
+    emotions: Dict[str, float] = {}
+    buf, pos = "", 0
+    for chunk in chunks:
+        buf += chunk
+        pos = gemini_handler._parse_emotion_text(buf, pos, False, emotions)
+    gemini_handler._parse_emotion_text(buf, pos, True, emotions)
+    return emotions
+
+
+@pytest.mark.parametrize("chunks", [
+    ["Calm-10.", "5, Joy-20"],   # split after the decimal point
+    ["Calm-10", ".5, Joy-20"],   # split before the decimal point
+    ["Calm-1", "0.5, Joy-2", "0"],  # split between digits
+    ["Calm - 10.5, Joy - 20"],   # single chunk, spaced
+])
+def test_number_split_across_chunks(chunks):
+    assert _parse_chunks(chunks) == {"Calm": 10.5, "Joy": 20.0}
+
+
+def test_every_split_point_matches_unsplit_parse():
+    text = "Happy-30.5, Sad-20, Calm Mind-15.25, Anxious-10, Hopeful-24.25"
+    expected = _parse_chunks([text])
+    assert len(expected) == 5
+    for i in range(1, len(text)):
+        assert _parse_chunks([text[:i], text[i:]]) == expected, f"split at {i}"
+
+
+def test_out_of_range_percentage_is_skipped():
+    assert _parse_chunks(["Joy-120, Calm-40, Hope-30, Fear-30"]) == {"Calm": 40.0, "Hope": 30.0, "Fear": 30.0}
+
+
+def test_prepare_emotion_prompts_keeps_count_suffix_on_long_entries():
+    settings = gemini_handler.settings
+    long_entry = "x" * (settings.max_chars_per_prompt + 100)
+    prompts = gemini_handler.prepare_emotion_prompts([long_entry, "short", long_entry, ""])
+    assert prompts == ["x" * settings.max_chars_per_prompt + " (x2)", "short"]
+
+
+def test_prepare_emotion_prompts_caps_unique_entries():
+    settings = gemini_handler.settings
+    prompts = gemini_handler.prepare_emotion_prompts([f"entry {i}" for i in range(settings.max_prompts + 10)])
+    assert prompts == [f"entry {i}" for i in range(settings.max_prompts)]
+
+
+def test_emotion_cache_key_respects_entry_boundaries_and_order():
+    key = gemini_handler.emotion_cache_key
+    assert key(["a\n---\nb"]) != key(["a", "b"])
+    assert key(["ab"]) != key(["a", "b"])
+    assert key(["a", "b"]) != key(["b", "a"])
+    assert key(["a", "b"]) == key(["a", "b"])